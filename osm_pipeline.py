@@ -23,33 +23,37 @@ if sys.platform == 'win32':
     import os
     os.environ['PYTHONIOENCODING'] = 'utf-8'
     try:
-        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
-    except AttributeError:
-        # Fallback for older Python versions or different console types
+        # Switch the existing streams in place; a codecs writer would add
+        # a Python-level encode to every print
         sys.stdout.reconfigure(encoding='utf-8', errors='replace')
         sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+    except AttributeError:
+        # Fallback for consoles whose streams are not TextIOWrappers
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
 
-# Logging setup with safe formatting
-try:
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('osm_pipeline.log', encoding='utf-8', errors='replace'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-except Exception:
-    # Fallback to basic logging if there are encoding issues
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
 logger = logging.getLogger(__name__)
 
-# Import modular components
-from src.ui.menu import MenuSystem
+def _setup_logging():
+    """Configure logging with safe formatting (deferred until main runs)"""
+    if logging.getLogger().handlers:
+        return
+    
+    try:
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler('osm_pipeline.log', encoding='utf-8', errors='replace', delay=True),
+                logging.StreamHandler(sys.stdout)
+            ]
+        )
+    except Exception:
+        # Fallback to basic logging if there are encoding issues
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
 
 class OSMPipeline:
     """Main OSM Pipeline class - Modular wrapper"""
@@ -57,7 +61,8 @@ class OSMPipeline:
     def __init__(self):
         self.root_dir = Path(__file__).parent
         
-        # Initialize modular menu system
+        # Initialize modular menu system (imported here to keep module import light)
+        from src.ui.menu import MenuSystem
         self.menu_system = MenuSystem(self.root_dir)
         
         logger.info("OSM Pipeline initialized (Modular Edition)")
@@ -68,6 +73,7 @@ class OSMPipeline:
 
 def main():
     """Main function"""
+    _setup_logging()
     try:
         pipeline = OSMPipeline()
         while True:
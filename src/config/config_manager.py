@@ -4,32 +4,154 @@
 Configuration Management Module
 """
 
-import json
+import os
+import copy
+import mmap
 import logging
+import functools
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def _loads(data: bytes):
+        # json.loads needs real bytes; bytes() is a no-op for bytes input
+        return json.loads(bytes(data))
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 logger = logging.getLogger(__name__)
 
+# Config files larger than this are parsed straight from a read-only mmap
+_MMAP_THRESHOLD = 64 * 1024
+
+@functools.lru_cache(maxsize=128)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse a config file; shared by all ConfigManager instances.
+    
+    mtime_ns and size are part of the cache key, so an edited file misses
+    the cache and its stale entry ages out of the LRU.
+    """
+    if size > _MMAP_THRESHOLD:
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            return _loads(view)
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+# Config directories already created in this process
+_ENSURED_DIRS = set()
+
+# Rendering defaults shared by every config built with create_config
+_CONFIG_DEFAULTS = {
+    "style": "osm-carto",
+    "output_format": "png",
+    "tile_size": 256
+}
+
+# Default template.json contents, serialized once at import
+_TEMPLATE_BYTES = _dumps({
+    "name": "project_name",
+    "description": "Project description",
+    "pbf_path": "/pbf/region.osm.pbf",
+    "render_type": "bbox",
+    "bbox": {
+        "min_lon": -10.0,
+        "min_lat": 35.0,
+        "max_lon": 5.0,
+        "max_lat": 45.0
+    },
+    "zoom_levels": {
+        "min_zoom": 0,
+        "max_zoom": 12
+    },
+    "style": "osm-carto",
+    "output_format": "png",
+    "tile_size": 256,
+    "created_at": "2024-01-01T00:00:00"
+})
+
+# Structural rules behind ConfigManager.validate_config's error messages
+_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["name", "pbf_path", "render_type", "zoom_levels"],
+    "properties": {
+        "zoom_levels": {
+            "type": "object",
+            "required": ["min_zoom", "max_zoom"],
+            "properties": {
+                "min_zoom": {"type": "integer", "minimum": 0, "maximum": 20},
+                "max_zoom": {"type": "integer", "minimum": 0, "maximum": 20}
+            }
+        }
+    },
+    "if": {
+        "properties": {"render_type": {"const": "bbox"}},
+        "required": ["render_type"]
+    },
+    "then": {"required": ["bbox"]}
+}
+
+@functools.lru_cache(maxsize=None)
+def _config_validator():
+    """Compile _CONFIG_SCHEMA on first use
+    
+    jsonschema is imported here rather than at module load: only the slow
+    path of validate_config, for an invalid config, needs it.
+    """
+    from jsonschema import Draft7Validator
+    return Draft7Validator(_CONFIG_SCHEMA)
+
 class ConfigManager:
     """Configuration file management"""
     
     def __init__(self, config_dir: Path):
         self.config_dir = config_dir
-        self.config_dir.mkdir(exist_ok=True)
+        if config_dir not in _ENSURED_DIRS:
+            self.config_dir.mkdir(exist_ok=True)
+            _ENSURED_DIRS.add(config_dir)
+        # Config directory listing: (directory st_mtime_ns, files)
+        self._list_cache: Optional[Tuple[int, List[Path]]] = None
     
     def list_configs(self) -> List[Path]:
-        """List all configuration files"""
-        return list(self.config_dir.glob("*.json"))
+        """List all configuration files
+        
+        The listing is rescanned only when the directory mtime changes.
+        """
+        mtime = self.config_dir.stat().st_mtime_ns
+        if self._list_cache and self._list_cache[0] == mtime:
+            return list(self._list_cache[1])
+        
+        with os.scandir(self.config_dir) as entries:
+            files = [Path(e.path) for e in entries
+                     if e.name.endswith('.json') and e.is_file()]
+        self._list_cache = (mtime, files)
+        return list(files)
     
     def load_config(self, config_file: Path) -> Optional[Dict]:
-        """Load configuration from file"""
+        """Load configuration from file
+        
+        Parsed configs are cached process-wide until the file's mtime or size
+        changes. Each caller gets its own copy, so mutating it (save_config
+        stamps updated_at) never leaks into the cache.
+        """
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            st = config_file.stat()
+            return copy.deepcopy(_parse_cached(os.path.abspath(config_file), st.st_mtime_ns, st.st_size))
         except Exception as e:
-            logger.error(f"Cannot load config {config_file}: {e}")
+            logger.error("Cannot load config %s: %s", config_file, e)
             return None
     
     def save_config(self, config: Dict, filename: str) -> bool:
@@ -37,13 +159,15 @@ class ConfigManager:
         config_file = self.config_dir / f"{filename}.json"
         try:
             config['updated_at'] = datetime.now().isoformat()
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with open(config_file, 'wb') as f:
+                f.write(_dumps(config))
+            _parse_cached.cache_clear()
+            self._list_cache = None
             
-            logger.info(f"Config saved: {config_file}")
+            logger.info("Config saved: %s", config_file)
             return True
         except Exception as e:
-            logger.error(f"Cannot save config: {e}")
+            logger.error("Cannot save config: %s", e)
             return False
     
     def load_template(self) -> Optional[Dict]:
@@ -68,9 +192,7 @@ class ConfigManager:
                 "min_zoom": min_zoom,
                 "max_zoom": max_zoom
             },
-            "style": "osm-carto",
-            "output_format": "png",
-            "tile_size": 256,
+            **_CONFIG_DEFAULTS,
             "created_at": datetime.now().isoformat()
         }
         
@@ -81,32 +203,27 @@ class ConfigManager:
     
     def validate_config(self, config: Dict) -> bool:
         """Basic config validation"""
-        required_fields = ['name', 'pbf_path', 'render_type', 'zoom_levels']
-        
-        for field in required_fields:
-            if field not in config:
-                logger.error(f"Missing required field: {field}")
-                return False
-        
-        # Validate zoom levels
-        zoom_levels = config.get('zoom_levels', {})
-        min_zoom = zoom_levels.get('min_zoom')
-        max_zoom = zoom_levels.get('max_zoom')
-        
-        if not (isinstance(min_zoom, int) and isinstance(max_zoom, int)):
-            logger.error("Invalid zoom levels")
-            return False
-        
-        if not (0 <= min_zoom <= max_zoom <= 20):
-            logger.error("Zoom levels must be between 0-20")
-            return False
-        
-        # Validate bbox for bbox type
-        if config.get('render_type') == 'bbox' and 'bbox' not in config:
-            logger.error("Bbox required for bbox render type")
-            return False
+        # Fast path: a single pass that accepts well-formed configs
+        try:
+            zoom_levels = config['zoom_levels']
+            min_zoom = zoom_levels['min_zoom']
+            max_zoom = zoom_levels['max_zoom']
+            if (type(min_zoom) is int and type(max_zoom) is int
+                    and 0 <= min_zoom <= max_zoom <= 20
+                    and 'name' in config and 'pbf_path' in config
+                    and (config['render_type'] != 'bbox' or 'bbox' in config)):
+                return True
+        except (KeyError, TypeError):
+            pass
         
-        return True
+        # Slow path: let the schema explain what is wrong
+        error = next(_config_validator().iter_errors(config), None)
+        if error is not None:
+            logger.error("Invalid config: %s", error.message)
+        else:
+            # JSON Schema cannot compare sibling values
+            logger.error("Invalid zoom levels: min_zoom must be an integer not above max_zoom")
+        return False
     
     def create_template_file(self) -> bool:
         """Create a default template.json file"""
@@ -116,35 +233,16 @@ class ConfigManager:
             logger.warning("Template file already exists")
             return False
         
-        template_config = {
-            "name": "project_name",
-            "description": "Project description",
-            "pbf_path": "/pbf/region.osm.pbf",
-            "render_type": "bbox",
-            "bbox": {
-                "min_lon": -10.0,
-                "min_lat": 35.0,
-                "max_lon": 5.0,
-                "max_lat": 45.0
-            },
-            "zoom_levels": {
-                "min_zoom": 0,
-                "max_zoom": 12
-            },
-            "style": "osm-carto",
-            "output_format": "png",
-            "tile_size": 256,
-            "created_at": "2024-01-01T00:00:00"
-        }
-        
         try:
-            with open(template_file, 'w', encoding='utf-8') as f:
-                json.dump(template_config, f, indent=2, ensure_ascii=False)
+            with open(template_file, 'wb') as f:
+                f.write(_TEMPLATE_BYTES)
+            _parse_cached.cache_clear()
+            self._list_cache = None
             
-            logger.info(f"Template file created: {template_file}")
+            logger.info("Template file created: %s", template_file)
             return True
         except Exception as e:
-            logger.error(f"Cannot create template file: {e}")
+            logger.error("Cannot create template file: %s", e)
             return False
     
     def create_sample_configs(self) -> bool:
@@ -190,17 +288,28 @@ class ConfigManager:
             }
         }
         
+        # One directory snapshot instead of an exists() check per sample
+        with os.scandir(self.config_dir) as entries:
+            existing = {e.name for e in entries if e.is_file()}
+        
         created_count = 0
+        created_at = datetime.now().isoformat()
         for filename, config in samples.items():
-            config_file = self.config_dir / f"{filename}.json"
-            if not config_file.exists():
+            config_name = f"{filename}.json"
+            if config_name not in existing:
+                config_file = self.config_dir / config_name
+                tmp_file = self.config_dir / f"{config_name}.tmp"
                 try:
-                    config['created_at'] = datetime.now().isoformat()
-                    with open(config_file, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, indent=2, ensure_ascii=False)
+                    config['created_at'] = created_at
+                    with open(tmp_file, 'wb') as f:
+                        f.write(_dumps(config))
+                    # Atomic rename so a crash never leaves half-written JSON
+                    os.replace(tmp_file, config_file)
+                    _parse_cached.cache_clear()
+                    self._list_cache = None
                     created_count += 1
-                    logger.info(f"Sample config created: {filename}")
+                    logger.info("Sample config created: %s", filename)
                 except Exception as e:
-                    logger.error(f"Cannot create sample {filename}: {e}")
+                    logger.error("Cannot create sample %s: %s", filename, e)
         
         return created_count > 0
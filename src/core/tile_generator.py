@@ -4,24 +4,33 @@
 Tile Generation Core Module
 """
 
+import itertools
+import json
 import math
+import os
+import signal
 import subprocess
 import time
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
-from ..utils.tile_validator import TileValidator
+from .tile_worker import DONE_MARKER
 
 logger = logging.getLogger(__name__)
 
+# Worker script run inside osm_tools; shipped through the shared tiles volume
+WORKER_SOURCE = Path(__file__).with_name("tile_worker.py")
+WORKER_DIR_NAME = ".tilegen"
+
 class TileGenerator:
     """Core tile generation functionality"""
     
     def __init__(self, root_dir: Path):
         self.root_dir = root_dir
         self.tiles_dir = root_dir / "tiles"
+        self._worker: Optional[subprocess.Popen] = None
         
     def deg2num(self, lat_deg: float, lon_deg: float, zoom: int) -> Tuple[int, int]:
         """Convert coordinates to tile numbers"""
@@ -31,24 +40,43 @@ class TileGenerator:
         y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
         return (x, y)
     
-    def estimate_tile_count(self, bbox: Dict, min_zoom: int, max_zoom: int) -> int:
-        """Estimate total tile count for bbox and zoom range"""
-        total_tiles = 0
+    def zoom_bounds(self, bbox: Optional[Dict], min_zoom: int,
+                    max_zoom: int) -> List[Tuple[int, int, int, int, int]]:
+        """Tile ranges per zoom as (zoom, min_x, max_x, min_y, max_y)
+        
+        A bbox of None covers the whole world.
+        """
+        if bbox is None:
+            return [(zoom, 0, (1 << zoom) - 1, 0, (1 << zoom) - 1)
+                    for zoom in range(min_zoom, max_zoom + 1)]
+        
+        # Project the bbox corners once; each zoom level only rescales them
+        west = (bbox['min_lon'] + 180.0) / 360.0
+        east = (bbox['max_lon'] + 180.0) / 360.0
+        south = (1.0 - math.asinh(math.tan(math.radians(bbox['min_lat']))) / math.pi) / 2.0
+        north = (1.0 - math.asinh(math.tan(math.radians(bbox['max_lat']))) / math.pi) / 2.0
+        
+        bounds = []
         for zoom in range(min_zoom, max_zoom + 1):
-            min_x, max_y = self.deg2num(bbox['min_lat'], bbox['min_lon'], zoom)
-            max_x, min_y = self.deg2num(bbox['max_lat'], bbox['max_lon'], zoom)
+            n = 2.0 ** zoom
+            min_x, max_y = int(west * n), int(south * n)
+            max_x, min_y = int(east * n), int(north * n)
             
-            # Ensure bounds
-            max_tiles = 2 ** zoom
-            min_x = max(0, min_x)
-            max_x = min(max_tiles - 1, max_x)
-            min_y = max(0, min_y)
-            max_y = min(max_tiles - 1, max_y)
+            # Ensure bounds (plain comparisons, no min()/max() calls)
+            last = (1 << zoom) - 1
+            min_x = 0 if min_x < 0 else min_x
+            max_x = last if max_x > last else max_x
+            min_y = 0 if min_y < 0 else min_y
+            max_y = last if max_y > last else max_y
             
-            tiles_this_zoom = (max_x - min_x + 1) * (max_y - min_y + 1)
-            total_tiles += tiles_this_zoom
+            bounds.append((zoom, min_x, max_x, min_y, max_y))
         
-        return total_tiles
+        return bounds
+    
+    def estimate_tile_count(self, bbox: Dict, min_zoom: int, max_zoom: int) -> int:
+        """Estimate total tile count for bbox and zoom range"""
+        return sum((max_x - min_x + 1) * (max_y - min_y + 1)
+                   for _, min_x, max_x, min_y, max_y in self.zoom_bounds(bbox, min_zoom, max_zoom))
     
     def generate_tiles(self, config: Dict) -> bool:
         """Generate tiles using Docker container with real-time progress"""
@@ -73,8 +101,18 @@ class TileGenerator:
                 zoom_levels.get('max_zoom', 12)
             )
         
-        # Create tile generation script (simplified for better performance)
-        tile_script = self._create_simple_tile_script(config)
+        # Generation job for the persistent container worker; tile ranges
+        # are computed here once so the worker does no projection math
+        bbox = None if config['render_type'] == 'full' else config.get('bbox')
+        job = {
+            'action': 'generate',
+            'project_name': project_name,
+            'bounds': self.zoom_bounds(
+                bbox,
+                config['zoom_levels']['min_zoom'],
+                config['zoom_levels']['max_zoom']
+            )
+        }
         
         try:
             logger.info(f"Generating {project_name} tiles...")
@@ -86,60 +124,23 @@ class TileGenerator:
             
             
             
-            # Run script in container with real-time output (unbuffered Python)
-            cmd = ['docker', 'exec', 'osm_tools', 'python3', '-u', '-c', tile_script]
-            
-            # Use Popen for real-time output with proper encoding and unbuffered
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT,  # Combine stderr with stdout
-                text=True, 
-                encoding='utf-8',
-                errors='replace',
-                universal_newlines=True,
-                bufsize=0  # Unbuffered for real-time output
-            )
-            
-            # Monitor progress in real-time
-            output_lines = []
-            
+            # Run the job in the container worker with real-time output
+            result = None
             try:
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        line = output.strip()
-                        if line:  # Only print non-empty lines
-                            print(line)
-                            output_lines.append(line)
-                            
-                # Get any remaining output
-                remaining_output = process.stdout.read()
-                if remaining_output:
-                    remaining_lines = remaining_output.strip().split('\n')
-                    for line in remaining_lines:
-                        if line.strip():
-                            print(line.strip())
-                            output_lines.append(line.strip())
-                            
+                result = self._run_worker_job(job)
             except Exception as e:
                 print(f"Error reading output: {e}")
-                
-            stdout_lines = output_lines
-            stderr_lines = []
-            
-            return_code = process.returncode
             
             # Print completion line
             print()
             
-            # Validate tiles and check for missing ones
-            validator = TileValidator(output_dir)
-            validation_report = validator.get_validation_report(config)
-            
-            if return_code == 0:
+            if result and result.get('ok'):
+                # The worker checked every tile itself and reports the ones it
+                # could not fetch, so the output directory is not rescanned
+                expected = sum((max_x - min_x + 1) * (max_y - min_y + 1)
+                               for _, min_x, max_x, min_y, max_y in job['bounds'])
+                validation_report = self._worker_report(expected, result['generated'], result['failed'])
+                
                 print("\n" + "="*60)
                 print("TILE GENERATION COMPLETED SUCCESSFULLY")
                 print("="*60)
@@ -173,7 +174,7 @@ class TileGenerator:
                 print("\n" + "="*60)
                 print("TILE GENERATION FAILED")
                 print("="*60)
-                error_output = ''.join(stderr_lines)
+                error_output = result.get('error', '') if result else 'tile worker exited unexpectedly'
                 if error_output:
                     print(f"Error: {error_output}")
                 print("="*60)
@@ -181,14 +182,124 @@ class TileGenerator:
                 logger.error(f"Tile generation error: {error_output}")
                 return False
                 
-        except subprocess.TimeoutExpired:
-            print("\nERROR: Tile generation timeout (1 hour)")
-            logger.error("Tile generation timeout (1 hour)")
-            return False
         except Exception as e:
             print(f"\nERROR: Tile generation exception: {e}")
             logger.error(f"Tile generation exception: {e}")
             return False
+        finally:
+            self._stop_worker()
+    
+    def _start_worker(self) -> subprocess.Popen:
+        """Start the long-running tile worker in osm_tools, or reuse it"""
+        if self._worker is not None and self._worker.poll() is None:
+            return self._worker
+        
+        # Copy the worker into the shared volume only when it changed
+        worker_dir = self.tiles_dir / WORKER_DIR_NAME
+        worker_dir.mkdir(parents=True, exist_ok=True)
+        target = worker_dir / WORKER_SOURCE.name
+        source = WORKER_SOURCE.read_bytes()
+        if not target.exists() or target.read_bytes() != source:
+            target.write_bytes(source)
+        
+        cmd = ['docker', 'exec', '-i', 'osm_tools', 'python3', '-u',
+               f"/data/tiles/{WORKER_DIR_NAME}/{WORKER_SOURCE.name}"]
+        self._worker = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,  # Combine stderr with stdout
+            start_new_session=True  # Own process group, killed as a unit
+        )
+        return self._worker
+    
+    def _run_worker_job(self, job: Dict) -> Optional[Dict]:
+        """Send one job to the worker, echo its progress and return its result
+        
+        Returns None if the worker exits before finishing the job.
+        """
+        worker = self._start_worker()
+        worker.stdin.write(json.dumps(job).encode('utf-8') + b'\n')
+        worker.stdin.flush()
+        
+        lines = self._stream_output(worker, DONE_MARKER)
+        if lines and lines[-1].startswith(DONE_MARKER):
+            return json.loads(lines[-1][len(DONE_MARKER):])
+        return None
+    
+    def _stop_worker(self):
+        """Close the worker's job stream and wait for it to exit
+        
+        EOF on stdin also makes the worker abandon a job still in progress
+        (e.g. after an interrupt), so renderd is not left serving a ghost run.
+        """
+        if self._worker is None:
+            return
+        
+        worker = self._worker
+        self._worker = None
+        try:
+            worker.stdin.close()
+            worker.wait(timeout=30)
+            return
+        except Exception:
+            pass
+        
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(worker.pid, signal.SIGTERM)
+            else:
+                worker.terminate()
+            worker.wait(timeout=5)
+        except Exception:
+            worker.kill()
+    
+    def _stream_output(self, process: subprocess.Popen, until: str) -> List[str]:
+        """Echo a child's output line by line and return the non-empty lines
+        
+        Reads the pipe in large chunks instead of readline(), so chatty
+        progress output never throttles the child. Returns as soon as a line
+        starting with `until` arrives (that line is returned last but not
+        echoed), or at EOF if the child exits first. Jobs are not time
+        limited: a full render can legitimately run for many hours.
+        """
+        lines = []
+        pending = b''
+        fd = process.stdout.fileno()
+        
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            *complete, pending = (pending + chunk).split(b'\n')
+            for raw in complete:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if line.startswith(until):
+                    lines.append(line)
+                    return lines
+                if line:  # Only print non-empty lines
+                    print(line)
+                    lines.append(line)
+        
+        # Trailing output without a final newline
+        line = pending.decode('utf-8', errors='replace').strip()
+        if line:
+            print(line)
+            lines.append(line)
+        
+        process.wait()
+        return lines
+    
+    def _worker_report(self, expected: int, valid: int, failed: List) -> Dict:
+        """Build a TileValidator-style report from a worker job result"""
+        missing_tiles = [tuple(tile) for tile in failed]
+        return {
+            'expected': expected,
+            'valid': valid,
+            'missing': len(missing_tiles),
+            'missing_tiles': missing_tiles,
+            'completion_rate': (valid / expected * 100) if expected > 0 else 0
+        }
     
     def _show_generation_info(self, config: Dict):
         """Show generation information before starting"""
@@ -395,187 +506,6 @@ if __name__ == "__main__":
 '''
         return script
     
-    def _create_simple_tile_script(self, config: Dict) -> str:
-        """Create simplified Python script for tile generation"""
-        bbox = config.get('bbox', None)
-        min_zoom = config['zoom_levels']['min_zoom']
-        max_zoom = config['zoom_levels']['max_zoom']
-        render_type = config['render_type']
-        project_name = config['name']
-        
-        script = f'''
-import math
-import subprocess
-import time
-import shutil
-from pathlib import Path
-
-def deg2num(lat_deg, lon_deg, zoom):
-    lat_rad = math.radians(lat_deg)
-    n = 2.0 ** zoom
-    x = int((lon_deg + 180.0) / 360.0 * n)
-    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
-    return (x, y)
-
-def validate_tile(tile_path):
-    """Validate if tile is complete and valid"""
-    if not tile_path.exists():
-        return False
-    
-    # Quick PNG header check
-    try:
-        with open(tile_path, 'rb') as f:
-            header = f.read(8)
-            if header != b'\\x89PNG\\r\\n\\x1a\\n':
-                return False
-    except:
-        return False
-    
-    return True
-
-def download_tile_with_retry(tile_url, tile_path, zoom, x, y, max_retries=3):
-    """Enhanced download tile with hybrid cache/download mechanism"""
-    # First try to copy from renderd cache
-    cache_tile_path = Path(f"/var/cache/renderd/tiles/default/{{zoom}}/{{x}}/{{y}}.png")
-    
-    if cache_tile_path.exists() and validate_tile(cache_tile_path):
-        try:
-            # Ensure output directory exists
-            tile_path.parent.mkdir(parents=True, exist_ok=True)
-            # Copy from cache
-            shutil.copy2(str(cache_tile_path), str(tile_path))
-            if validate_tile(tile_path):
-                return True
-        except Exception:
-            pass
-    
-    # If cache copy failed, download via HTTP
-    for attempt in range(max_retries):
-        try:
-            # Use curl with better options for reliability
-            cmd = [
-                'curl', '-s', '-L', '--max-time', '30', '--retry', '2', 
-                '--retry-delay', '1', '-o', str(tile_path), tile_url
-            ]
-            result = subprocess.run(cmd, timeout=45, capture_output=True)
-            
-            if result.returncode == 0 and validate_tile(tile_path):
-                return True
-            
-            # If failed, remove invalid file
-            if tile_path.exists():
-                tile_path.unlink()
-                
-        except subprocess.TimeoutExpired:
-            if tile_path.exists():
-                tile_path.unlink()
-        except Exception:
-            if tile_path.exists():
-                tile_path.unlink()
-        
-        # Exponential backoff with jitter
-        if attempt < max_retries - 1:
-            wait_time = (0.5 * (2 ** attempt)) + (0.1 * attempt)
-            time.sleep(wait_time)
-    
-    return False
-
-def generate_tiles():
-    project_name = "{project_name}"
-    render_type = "{render_type}"
-    bbox = {bbox}
-    min_zoom = {min_zoom}
-    max_zoom = {max_zoom}
-
-    print(f"Starting generation for: {{project_name}}")
-    
-    base_url = "http://localhost/tile"
-    output_base = f"/data/tiles/{{project_name}}"
-
-    total_generated = 0
-    failed_tiles = []
-
-    for zoom in range(min_zoom, max_zoom + 1):
-        print(f"Processing zoom level {{zoom}}...")
-
-        if render_type == "full":
-            max_tiles = 2 ** zoom
-            min_x, min_y = 0, 0
-            max_x, max_y = max_tiles - 1, max_tiles - 1
-        else:
-            min_x, max_y = deg2num(bbox['min_lat'], bbox['min_lon'], zoom)
-            max_x, min_y = deg2num(bbox['max_lat'], bbox['max_lon'], zoom)
-            
-            max_tiles = 2 ** zoom
-            min_x = max(0, min_x)
-            max_x = min(max_tiles - 1, max_x)
-            min_y = max(0, min_y)
-            max_y = min(max_tiles - 1, max_y)
-
-        zoom_generated = 0
-        zoom_failed = 0
-
-        for x in range(min_x, max_x + 1):
-            for y in range(min_y, max_y + 1):
-                tile_dir = Path(f"{{output_base}}/{{zoom}}/{{x}}")
-                tile_dir.mkdir(parents=True, exist_ok=True)
-
-                tile_path = tile_dir / f"{{y}}.png"
-                tile_url = f"{{base_url}}/{{zoom}}/{{x}}/{{y}}.png"
-
-                # Check if tile already exists and is valid
-                if validate_tile(tile_path):
-                    zoom_generated += 1
-                    total_generated += 1
-                    continue
-
-                # Download tile with retry
-                if download_tile_with_retry(tile_url, tile_path, zoom, x, y):
-                    zoom_generated += 1
-                    total_generated += 1
-                else:
-                    zoom_failed += 1
-                    failed_tiles.append((zoom, x, y))
-
-                # Minimal delay
-                time.sleep(0.01)
-
-        print(f"Zoom {{zoom}} completed: {{zoom_generated}} tiles ({{zoom_failed}} failed)")
-
-    # Retry failed tiles with enhanced retry mechanism
-    if failed_tiles:
-        print(f"\\nRetrying {{len(failed_tiles)}} failed tiles with enhanced retry...")
-        retry_success = 0
-        final_failures = []
-        
-        for zoom, x, y in failed_tiles:
-            tile_dir = Path(f"{{output_base}}/{{zoom}}/{{x}}")
-            tile_path = tile_dir / f"{{y}}.png"
-            tile_url = f"{{base_url}}/{{zoom}}/{{x}}/{{y}}.png"
-            
-            # Enhanced retry with more attempts
-            if download_tile_with_retry(tile_url, tile_path, zoom, x, y, max_retries=10):
-                retry_success += 1
-                total_generated += 1
-            else:
-                final_failures.append((zoom, x, y))
-        
-        print(f"Retry completed: {{retry_success}}/{{len(failed_tiles)}} tiles recovered")
-        if final_failures:
-            print(f"Final failures: {{len(final_failures)}} tiles could not be downloaded")
-            for zoom, x, y in final_failures[:5]:  # Show first 5 failures
-                print(f"  Failed: {{zoom}}/{{x}}/{{y}}")
-            if len(final_failures) > 5:
-                print(f"  ... and {{len(final_failures) - 5}} more")
-
-    print(f"Generation finished: {{total_generated}} tiles total")
-    return total_generated
-
-if __name__ == "__main__":
-    result = generate_tiles()
-'''
-        return script
-    
     def _retry_missing_tiles(self, config: Dict, validation_report: Dict) -> bool:
         """Retry missing tiles"""
         missing_count = validation_report['missing']
@@ -587,42 +517,33 @@ if __name__ == "__main__":
         print(f"RETRYING {missing_count} MISSING TILES")
         print("="*60)
         
-        # Create retry script for missing tiles only
-        retry_script = self._create_retry_script(config, validation_report['missing_tiles'])
+        # Retry job for missing tiles only, on the already running worker.
+        # Sorted by (zoom, x, y) so consecutive requests hit the same column
+        # directory and neighbouring tiles of the same renderd metatile, and
+        # sent as one [zoom, x, [y, ...]] entry per column to keep large
+        # retry lists compact.
+        missing_tiles = sorted(validation_report['missing_tiles'])
+        job = {
+            'action': 'retry',
+            'project_name': config['name'],
+            'total': len(missing_tiles),
+            'missing_columns': [
+                [zoom, x, [tile[2] for tile in tiles]]
+                for (zoom, x), tiles in itertools.groupby(missing_tiles, key=lambda t: (t[0], t[1]))
+            ]
+        }
         
         try:
-            cmd = ['docker', 'exec', 'osm_tools', 'python3', '-u', '-c', retry_script]
-            
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT,
-                text=True, 
-                encoding='utf-8',
-                errors='replace',
-                universal_newlines=True,
-                bufsize=0
-            )
-            
             # Monitor retry progress
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    line = output.strip()
-                    if line:
-                        print(line)
-            
-            return_code = process.returncode
+            result = self._run_worker_job(job)
             
-            if return_code == 0:
-                # Re-validate after retry
-                project_name = config['name']
-                output_dir = self.tiles_dir / project_name
-                
-                validator = TileValidator(output_dir)
-                final_report = validator.get_validation_report(config)
+            if result and result.get('ok'):
+                # Tiles recovered by the retry are now valid as well
+                final_report = self._worker_report(
+                    validation_report['expected'],
+                    validation_report['valid'] + result['generated'],
+                    result['failed']
+                )
                 
                 print(f"\nRetry completed!")
                 print(f"Final completion rate: {final_report['completion_rate']:.1f}%")
@@ -636,86 +557,3 @@ if __name__ == "__main__":
         except Exception as e:
             print(f"Error during retry: {e}")
             return False
-    
-    def _create_retry_script(self, config: Dict, missing_tiles: list) -> str:
-        """Create script to retry only missing tiles"""
-        project_name = config['name']
-        render_type = config['render_type']
-        
-        # Convert missing tiles list to string format for script
-        missing_tiles_str = str(missing_tiles)
-        
-        script = f'''
-import subprocess
-import time
-from pathlib import Path
-
-def download_tile_with_retry(tile_url, tile_path, max_retries=5):
-    """Enhanced download tile with robust retry mechanism"""
-    for attempt in range(max_retries):
-        try:
-            # Use curl with better options for reliability
-            cmd = [
-                'curl', '-s', '-L', '--max-time', '30', '--retry', '2', 
-                '--retry-delay', '1', '-o', str(tile_path), tile_url
-            ]
-            result = subprocess.run(cmd, timeout=45, capture_output=True)
-            
-            if result.returncode == 0 and tile_path.exists():
-                # PNG header validation
-                try:
-                    with open(tile_path, 'rb') as f:
-                        header = f.read(8)
-                        if header == b'\\x89PNG\\r\\n\\x1a\\n':
-                            return True
-                    except Exception:
-                        pass
-            
-            if tile_path.exists():
-                tile_path.unlink()
-                
-        except subprocess.TimeoutExpired:
-            if tile_path.exists():
-                tile_path.unlink()
-        except Exception:
-            if tile_path.exists():
-                tile_path.unlink()
-        
-        # Exponential backoff with jitter
-        wait_time = (0.5 * (2 ** attempt)) + (0.1 * attempt)
-        time.sleep(wait_time)
-    
-    return False
-
-def retry_missing_tiles():
-    project_name = "{project_name}"
-    render_type = "{render_type}"
-    missing_tiles = {missing_tiles_str}
-    
-    print(f"Retrying {{len(missing_tiles)}} missing tiles...")
-    
-    base_url = "http://localhost/tile"
-    output_base = f"/data/tiles/{{project_name}}"
-    
-    success_count = 0
-    
-    for zoom, x, y in missing_tiles:
-        tile_dir = Path(f"{{output_base}}/{{zoom}}/{{x}}")
-        tile_dir.mkdir(parents=True, exist_ok=True)
-        
-        tile_path = tile_dir / f"{{y}}.png"
-        tile_url = f"{{base_url}}/{{zoom}}/{{x}}/{{y}}.png"
-        
-        if download_tile_with_retry(tile_url, tile_path):
-            success_count += 1
-        
-        if success_count % 10 == 0:
-            print(f"Retry progress: {{success_count}}/{{len(missing_tiles)}}")
-    
-    print(f"Retry finished: {{success_count}}/{{len(missing_tiles)}} tiles recovered")
-    return success_count
-
-if __name__ == "__main__":
-    result = retry_missing_tiles()
-'''
-        return script
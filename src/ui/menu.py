@@ -4,46 +4,83 @@
 User Interface Menu System
 """
 
+import re
 import logging
+import functools
 from pathlib import Path
 from typing import Dict, Optional
 
 from ..utils.system_utils import SystemUtils
-from ..utils.docker_manager import DockerManager
-from ..config.config_manager import ConfigManager
-from ..utils.pbf_utils import PBFManager
-from ..core.tile_generator import TileGenerator
 
 logger = logging.getLogger(__name__)
 
+# Screen separators
+_BAR60 = "=" * 60
+_BAR50 = "=" * 50
+_DASH30 = "-" * 30
+
+# Accepted answers to (y/N) prompts
+_YES = frozenset({'y', 'yes'})
+
+# Project names: letters, digits, underscore and dash, at least one letter or digit
+_is_valid_name = re.compile(r'(?=[\w-]*[^\W_])[\w-]+').fullmatch
+
+_HEADER = "\n".join([
+    _BAR60,
+    "     OSM TILE GENERATOR",
+    "     Professional Edition v3.0 (Modular)",
+    _BAR60,
+    ""
+])
+
 class MenuSystem:
     """Main menu system for OSM tile generator"""
     
     def __init__(self, root_dir: Path):
         self.root_dir = root_dir
-        self.config_manager = ConfigManager(root_dir / "config")
-        self.pbf_manager = PBFManager(root_dir / "pbf")
-        self.tile_generator = TileGenerator(root_dir)
-        self.docker_manager = DockerManager(root_dir)
+        # Docker preparation that already succeeded this session; repeat
+        # generations skip it until a failure or cleanup resets the flags
+        self._images_ready = False
+        self._services_started = False
+    
+    # Components are imported and built on first use, so the menu comes up
+    # without loading what the chosen action never needs
+    @functools.cached_property
+    def config_manager(self):
+        from ..config.config_manager import ConfigManager
+        return ConfigManager(self.root_dir / "config")
+    
+    @functools.cached_property
+    def pbf_manager(self):
+        from ..utils.pbf_utils import PBFManager
+        return PBFManager(self.root_dir / "pbf")
+    
+    @functools.cached_property
+    def tile_generator(self):
+        from ..core.tile_generator import TileGenerator
+        return TileGenerator(self.root_dir)
+    
+    @functools.cached_property
+    def docker_manager(self):
+        from ..utils.docker_manager import DockerManager
+        return DockerManager(self.root_dir)
     
     def print_header(self):
         """Print application header"""
         SystemUtils.clear_screen()
-        print("=" * 60)
-        print("     OSM TILE GENERATOR")
-        print("     Professional Edition v3.0 (Modular)")
-        print("=" * 60)
-        print()
+        print(_HEADER)
     
     def main_menu(self):
         """Main menu"""
         self.print_header()
-        print("OSM TILE GENERATOR")
-        print("=" * 50)
-        print("1. Use existing config")
-        print("2. Create new config")
-        print("0. Exit")
-        print("=" * 50)
+        print("\n".join([
+            "OSM TILE GENERATOR",
+            _BAR50,
+            "1. Use existing config",
+            "2. Create new config",
+            "0. Exit",
+            _BAR50
+        ]))
         
         choice = input("\nYour choice (0-2): ").strip()
         
@@ -64,7 +101,7 @@ class MenuSystem:
         """Use existing configuration"""
         self.print_header()
         print("USE EXISTING CONFIG")
-        print("=" * 50)
+        print(_BAR50)
         
         config_files = self.config_manager.list_configs()
         
@@ -74,32 +111,32 @@ class MenuSystem:
             input("\nPress Enter to continue...")
             return
         
-        # Display configs
-        print("Available configurations:")
+        # Display configs; keep what was loaded for the selection below
+        loaded = {}
+        blocks = ["Available configurations:"]
         for i, config_file in enumerate(config_files, 1):
-            config = self.config_manager.load_config(config_file)
+            config = loaded[config_file] = self.config_manager.load_config(config_file)
             if config:
-                print(f"{i}. {config.get('name', config_file.stem)}")
-                print(f"   Description: {config.get('description', 'No description')}")
-                print(f"   PBF File: {config.get('pbf_path', 'Unknown')}")
-                print(f"   Type: {config.get('render_type', 'unknown')}")
-                
+                render_type = config.get('render_type', 'unknown')
                 zoom_levels = config.get('zoom_levels', {})
-                min_zoom = zoom_levels.get('min_zoom', '?')
-                max_zoom = zoom_levels.get('max_zoom', '?')
-                print(f"   Zoom: {min_zoom}-{max_zoom}")
-                
-                if config.get('render_type') == 'bbox' and config.get('bbox'):
-                    bbox = config['bbox']
-                    print(f"   Area: {bbox['min_lat']:.2f},{bbox['min_lon']:.2f} to {bbox['max_lat']:.2f},{bbox['max_lon']:.2f}")
-                print()
+                bbox = config.get('bbox')
+                area = (f"   Area: {bbox['min_lat']:.2f},{bbox['min_lon']:.2f} to {bbox['max_lat']:.2f},{bbox['max_lon']:.2f}\n"
+                        if render_type == 'bbox' and bbox else "")
+                blocks.append(
+                    f"{i}. {config.get('name', config_file.stem)}\n"
+                    f"   Description: {config.get('description', 'No description')}\n"
+                    f"   PBF File: {config.get('pbf_path', 'Unknown')}\n"
+                    f"   Type: {render_type}\n"
+                    f"   Zoom: {zoom_levels.get('min_zoom', '?')}-{zoom_levels.get('max_zoom', '?')}\n"
+                    f"{area}"
+                )
+        print("\n".join(blocks))
         
         # Select config
         try:
             choice = int(input("Select configuration (number): ")) - 1
             if 0 <= choice < len(config_files):
-                config_file = config_files[choice]
-                config = self.config_manager.load_config(config_file)
+                config = loaded[config_files[choice]]
                 if config:
                     self._start_generation(config)
             else:
@@ -113,16 +150,16 @@ class MenuSystem:
         """Create new configuration"""
         self.print_header()
         print("CREATE NEW CONFIG")
-        print("=" * 50)
+        print(_BAR50)
         
         # Project name
         while True:
             name = input("Project name: ").strip()
-            if name and name.replace('_', '').replace('-', '').isalnum():
+            if _is_valid_name(name):
                 config_file_path = self.config_manager.config_dir / f"{name}.json"
                 if config_file_path.exists():
                     overwrite = input(f"Project '{name}' already exists. Overwrite? (y/N): ").strip().lower()
-                    if overwrite in ['y', 'yes']:
+                    if overwrite in _YES:
                         break
                     else:
                         continue
@@ -186,7 +223,7 @@ class MenuSystem:
         
         confirm = input("\nSave and start generation? (y/N): ").strip().lower()
         
-        if confirm in ['y', 'yes']:
+        if confirm in _YES:
             if self.config_manager.save_config(config, name):
                 print(f"\nConfiguration saved!")
                 self._start_generation(config)
@@ -200,23 +237,23 @@ class MenuSystem:
     def _select_pbf_file(self) -> Optional[str]:
         """Select PBF file"""
         print("\nPBF FILE SELECTION")
-        print("-" * 30)
+        print(_DASH30)
         
-        pbf_files = self.pbf_manager.list_pbf_files()
+        # One directory scan gives names and sizes for every file
+        pbf_infos = self.pbf_manager.list_pbf_infos()
         
-        if not pbf_files:
+        if not pbf_infos:
             print("No PBF files found.")
             return None
         
         print("Available PBF files:")
-        for i, pbf_file in enumerate(pbf_files, 1):
-            info = self.pbf_manager.get_pbf_info(pbf_file)
+        for i, info in enumerate(pbf_infos, 1):
             print(f"{i}. {info['name']} ({info['size_mb']:.1f} MB)")
         
         try:
             choice = int(input("Select PBF file (number): ")) - 1
-            if 0 <= choice < len(pbf_files):
-                return f"/pbf/{pbf_files[choice].name}"
+            if 0 <= choice < len(pbf_infos):
+                return pbf_infos[choice]['path']
             else:
                 print("Error: Invalid choice!")
                 return None
@@ -227,7 +264,7 @@ class MenuSystem:
     def _get_bbox_input(self, pbf_path: str) -> Optional[Dict]:
         """Get bounding box coordinates"""
         print("\nBOUNDING BOX COORDINATES")
-        print("-" * 30)
+        print(_DASH30)
         
         # Show PBF bounds if available
         pbf_bounds = self.pbf_manager.get_pbf_bounds(pbf_path)
@@ -252,7 +289,9 @@ class MenuSystem:
             }
             
             # Validate coordinates
-            if not self.pbf_manager.validate_bbox_coordinates(bbox):
+            reasons = self.pbf_manager.bbox_coordinate_errors(bbox)
+            if reasons:
+                logger.error("Invalid bbox: " + "; ".join(reasons))
                 return None
             
             # Validate against PBF bounds
@@ -268,107 +307,114 @@ class MenuSystem:
     
     def show_config_summary(self, config: Dict):
         """Show configuration summary"""
-        print("\n" + "=" * 50)
-        print("CONFIGURATION SUMMARY")
-        print("=" * 50)
-        print(f"Project Name: {config.get('name', 'Unknown')}")
-        print(f"Description: {config.get('description', 'No description')}")
-        print(f"PBF File: {config.get('pbf_path', 'Unknown')}")
-        print(f"Render Type: {config.get('render_type', 'unknown')}")
-        
-        if config.get('render_type') == 'bbox' and config.get('bbox'):
-            bbox = config['bbox']
-            print(f"Bounding Box:")
-            print(f"  Min Longitude: {bbox['min_lon']}")
-            print(f"  Min Latitude: {bbox['min_lat']}")
-            print(f"  Max Longitude: {bbox['max_lon']}")
-            print(f"  Max Latitude: {bbox['max_lat']}")
-        
-        zoom_levels = config.get('zoom_levels', {})
-        print(f"Zoom Levels: {zoom_levels.get('min_zoom', '?')} - {zoom_levels.get('max_zoom', '?')}")
-        print(f"Output Format: {config.get('output_format', 'png')}")
-        print(f"Tile Size: {config.get('tile_size', 256)}px")
+        render_type = config.get('render_type', 'unknown')
+        bbox = config.get('bbox')
+        zoom_levels = config.get('zoom_levels') or {}
+        is_bbox = render_type == 'bbox' and bool(bbox)
+        
+        # Collected and printed in one go
+        lines = [
+            "\n" + _BAR50,
+            "CONFIGURATION SUMMARY",
+            _BAR50,
+            f"Project Name: {config.get('name', 'Unknown')}",
+            f"Description: {config.get('description', 'No description')}",
+            f"PBF File: {config.get('pbf_path', 'Unknown')}",
+            f"Render Type: {render_type}"
+        ]
+        
+        if is_bbox:
+            lines += [
+                f"Bounding Box:",
+                f"  Min Longitude: {bbox['min_lon']}",
+                f"  Min Latitude: {bbox['min_lat']}",
+                f"  Max Longitude: {bbox['max_lon']}",
+                f"  Max Latitude: {bbox['max_lat']}"
+            ]
+        
+        lines += [
+            f"Zoom Levels: {zoom_levels.get('min_zoom', '?')} - {zoom_levels.get('max_zoom', '?')}",
+            f"Output Format: {config.get('output_format', 'png')}",
+            f"Tile Size: {config.get('tile_size', 256)}px"
+        ]
         
         # Estimate tile count
-        if config.get('render_type') == 'bbox' and config.get('bbox') and zoom_levels:
+        if is_bbox and zoom_levels:
             total_tiles = self.tile_generator.estimate_tile_count(
-                config['bbox'], 
+                bbox, 
                 zoom_levels['min_zoom'], 
                 zoom_levels['max_zoom']
             )
-            print(f"Estimated Tiles: ~{total_tiles:,}")
+            lines.append(f"Estimated Tiles: ~{total_tiles:,}")
         
-        print("=" * 50)
+        lines.append(_BAR50)
+        print("\n".join(lines))
     
     def _start_generation(self, config: Dict):
         """Start tile generation with bulletproof Docker handling"""
         self.print_header()
         print("STARTING TILE GENERATION WITH TRACKING")
-        print("=" * 60)
+        print(_BAR60)
         
-        # 1. Comprehensive system check
-        print("[1] Checking system requirements...")
-        requirements_ok, issues = self.docker_manager.check_system_requirements()
-        if not requirements_ok:
-            print("\nERROR: System requirements not met:")
+        # 1. System, PBF file, Docker and images in one pre-flight pass
+        print("[1] Running pre-flight checks...")
+        pbf_path = self.root_dir / config['pbf_path'].lstrip('/')
+        preflight_ok, issues = self.docker_manager.preflight(
+            pbf_path, check_images=not self._images_ready)
+        if not preflight_ok:
+            print("\nERROR: Pre-flight checks failed:")
             for issue in issues:
                 print(f"   - {issue}")
             print("\nPlease resolve the issues and try again.")
             input("\nPress Enter to continue...")
             return
-        print("OK: System requirements met")
-        
-        # 2. Check PBF file
-        print(f"\n[2] Checking PBF file...")
-        pbf_path = self.root_dir / config['pbf_path'].lstrip('/')
-        if not pbf_path.exists():
-            print(f"ERROR: PBF file not found: {pbf_path}")
-            input("\nPress Enter to continue...")
-            return
-        print(f"OK: PBF file exists: {pbf_path.name}")
-        
-        # 3. Ensure Docker images are available
-        print(f"\n[3] Checking Docker images...")
-        if not self.docker_manager.ensure_images_available():
-            print("ERROR: Docker images could not be prepared!")
-            print("Check your internet connection and try again.")
-            input("\nPress Enter to continue...")
-            return
-        
-        # 4. Start Docker services robustly
-        print(f"\n[4] Starting Docker services...")
-        if not self.docker_manager.start_services_robust():
+        self._images_ready = True
+        print(f"OK: System, PBF file ({pbf_path.name}) and Docker images ready")
+        
+        # 2. Start Docker services robustly
+        print(f"\n[2] Starting Docker services...")
+        if self._services_started:
+            # Restarting would only recreate the same containers; step 3
+            # still checks that they are answering
+            print("OK: Docker services already running")
+        elif self.docker_manager.start_services_robust():
+            self._services_started = True
+        else:
             print("ERROR: Docker services could not be started!")
             print("Do you want to perform an emergency cleanup?")
             response = input("(y/N): ").strip().lower()
-            if response in ['y', 'yes']:
+            if response in _YES:
                 self.docker_manager.emergency_cleanup()
+                self._images_ready = False
             input("\nPress Enter to continue...")
             return
         
-        # 5. Verify PBF import readiness
-        print(f"\n[5] Checking PBF import readiness...")
+        # 3. Verify PBF import readiness
+        print(f"\n[3] Checking PBF import readiness...")
         if not self.docker_manager.verify_pbf_import_ready(pbf_path):
             print("ERROR: PBF import infrastructure is not ready!")
+            # Services may have gone down; start them afresh next time
+            self._services_started = False
             input("\nPress Enter to continue...")
             return
         
-        # 6. Start generation
-        print(f"\n[6] Starting tile generation...")
-        print("=" * 60)
-        print("SUCCESS: ALL CHECKS PASSED - STARTING PRODUCTION")
-        print("=" * 60)
+        # 4. Start generation
+        print("\n".join([
+            "\n[4] Starting tile generation...",
+            _BAR60,
+            "SUCCESS: ALL CHECKS PASSED - STARTING PRODUCTION",
+            _BAR60
+        ]))
         
         success = self.tile_generator.generate_tiles(config)
         
-        print("\n" + "=" * 60)
         if success:
-            print(f"SUCCESS! {config['name']} tile generation completed!")
-            print(f"Files saved in: tiles/{config['name']}/ directory")
+            outcome = (f"SUCCESS! {config['name']} tile generation completed!\n"
+                       f"Files saved in: tiles/{config['name']}/ directory")
         else:
-            print(f"FAILED! {config['name']} tile generation could not be completed!")
-            print("Check log files: osm_pipeline.log")
-        print("=" * 60)
+            outcome = (f"FAILED! {config['name']} tile generation could not be completed!\n"
+                       "Check log files: osm_pipeline.log")
+        print(f"\n{_BAR60}\n{outcome}\n{_BAR60}")
         
         input("\nPress Enter to continue...")
     
@@ -7,20 +7,22 @@ Command-line interface for generating and managing configuration templates.
 """
 
 import sys
+import argparse
 import logging
-from pathlib import Path
 from typing import List, Optional
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from .template_manager import TemplateManager
+except ImportError:
+    # Run as a script: this file's directory is already on sys.path
+    from template_manager import TemplateManager
 
-from utils.template_manager import TemplateManager
-
-# Windows encoding fix
+# Windows encoding fix: switch the existing streams to UTF-8 rather than
+# wrapping them in a codecs writer that encodes every print in Python
 if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, 'reconfigure'):
+            stream.reconfigure(encoding='utf-8')
 
 def setup_logging(verbose: bool = False):
     """Setup logging configuration"""
@@ -60,6 +62,23 @@ def print_usage():
     print("  python generate_templates.py --list")
     print("  python generate_templates.py --info cyprus.json")
 
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse the options listed in print_usage, warning about unknown ones"""
+    # Help is ours (print_usage) so it appears below the header like before
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-h', '--help', action='store_true')
+    parser.add_argument('--template', nargs='?', const='')
+    parser.add_argument('--samples', nargs='*')
+    parser.add_argument('--all-samples', action='store_true')
+    parser.add_argument('--list', action='store_true')
+    parser.add_argument('--info', nargs='?', const='')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    parser.add_argument('--no-pause', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+    if unknown:
+        print(f"WARNING: Ignoring unknown option(s): {' '.join(unknown)} (see --help)")
+    return options
+
 def create_template(manager: TemplateManager, template_name: Optional[str] = None) -> bool:
     """Create a template file"""
     print("Creating template configuration file...")
@@ -169,7 +188,8 @@ def main():
     args = sys.argv[1:]
     
     # Parse arguments
-    verbose = '--verbose' in args or '-v' in args
+    options = parse_args(args)
+    verbose = options.verbose
     setup_logging(verbose)
     
     try:
@@ -181,65 +201,36 @@ def main():
         print()
         
         # Handle command line arguments
-        if '--help' in args or '-h' in args:
+        if options.help:
             print_usage()
             return 0
         
-        elif '--list' in args:
+        elif options.list:
             list_configs(manager)
             return 0
         
-        elif '--info' in args:
-            try:
-                info_index = args.index('--info')
-                if info_index + 1 < len(args):
-                    filename = args[info_index + 1]
-                    show_config_info(manager, filename)
-                else:
-                    print("Error: --info requires a filename")
-                    return 1
-            except ValueError:
-                print("Error: Invalid --info usage")
+        elif options.info is not None:
+            if not options.info:
+                print("Error: --info requires a filename")
                 return 1
+            show_config_info(manager, options.info)
             return 0
         
-        elif '--template' in args:
-            try:
-                template_index = args.index('--template')
-                template_name = None
-                if template_index + 1 < len(args) and not args[template_index + 1].startswith('--'):
-                    template_name = args[template_index + 1]
-                
-                success = create_template(manager, template_name)
-                return 0 if success else 1
-            except ValueError:
-                print("Error: Invalid --template usage")
-                return 1
+        elif options.template is not None:
+            success = create_template(manager, options.template or None)
+            return 0 if success else 1
         
-        elif '--all-samples' in args:
+        elif options.all_samples:
             success = create_samples(manager)
             return 0 if success else 1
         
-        elif '--samples' in args:
-            try:
-                samples_index = args.index('--samples')
-                sample_names = []
-                
-                # Collect sample names after --samples
-                for i in range(samples_index + 1, len(args)):
-                    if args[i].startswith('--'):
-                        break
-                    sample_names.append(args[i])
-                
-                if not sample_names:
-                    print("Error: --samples requires at least one sample name")
-                    return 1
-                
-                success = create_samples(manager, sample_names)
-                return 0 if success else 1
-            except ValueError:
-                print("Error: Invalid --samples usage")
+        elif options.samples is not None:
+            if not options.samples:
+                print("Error: --samples requires at least one sample name")
                 return 1
+            
+            success = create_samples(manager, options.samples)
+            return 0 if success else 1
         
         else:
             # No specific arguments, run interactive mode or default action
@@ -263,7 +254,7 @@ def main():
         return 1
     finally:
         # Keep window open on Windows
-        if sys.platform == 'win32' and '--no-pause' not in args:
+        if sys.platform == 'win32' and not options.no_pause:
             input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
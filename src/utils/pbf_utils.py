@@ -4,13 +4,126 @@
 PBF File Utilities
 """
 
+import os
+import re
+import json
+import struct
+import zlib
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent stat() calls when listing PBF files
+_STAT_WORKERS = 8
+
+# Known bounds for common regions, keyed by lower-case PBF file name
+_KNOWN_BOUNDS = {
+    'cyprus-latest.osm.pbf': {
+        'min_lon': 32.0, 'max_lon': 35.0,
+        'min_lat': 34.5, 'max_lat': 35.8
+    },
+    'turkey-latest.osm.pbf': {
+        'min_lon': 25.5, 'max_lon': 45.0,
+        'min_lat': 35.8, 'max_lat': 42.5
+    },
+    'greece-latest.osm.pbf': {
+        'min_lon': 19.0, 'max_lon': 30.0,
+        'min_lat': 34.0, 'max_lat': 42.0
+    },
+    'italy-latest.osm.pbf': {
+        'min_lon': 6.0, 'max_lon': 19.0,
+        'min_lat': 35.0, 'max_lat': 48.0
+    },
+    'germany-latest.osm.pbf': {
+        'min_lon': 5.5, 'max_lon': 15.5,
+        'min_lat': 47.0, 'max_lat': 55.5
+    }
+}
+
+# Geofabrik date-stamped downloads (cyprus-250101.osm.pbf) share the
+# bounds of their -latest name
+_DATE_RE = re.compile(r'-\d{6,8}\.osm\.pbf$')
+
+# Sidecar in the PBF directory: header bounds by file name, with the
+# [mtime_ns, size] the file had when it was read
+BOUNDS_CACHE_NAME = ".bounds.json"
+
+# Sanity limits for the first BlobHeader/Blob (the spec caps them at 64KB/32MB)
+_MAX_BLOB_HEADER_SIZE = 64 * 1024
+_MAX_BLOB_SIZE = 32 * 1024 * 1024
+
+def _read_varint(buf: bytes, pos: int):
+    """Decode a protobuf varint at pos, return (value, next_pos)"""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _iter_fields(buf: bytes):
+    """Yield (field_number, value) for a protobuf message; bytes for length-delimited fields"""
+    pos = 0
+    while pos < len(buf):
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            value = buf[pos:pos + 8]
+            pos += 8
+        elif wire_type == 5:
+            value = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field, value
+
+def read_pbf_header_bounds(pbf_file: Path) -> Optional[Dict]:
+    """Bounds from the OSMHeader block at the start of a PBF file
+    
+    Only the first BlobHeader and Blob are read. Returns None if the
+    header has no bbox or uses a compression other than zlib.
+    """
+    with open(pbf_file, 'rb') as f:
+        header_size = struct.unpack('>I', f.read(4))[0]
+        if header_size > _MAX_BLOB_HEADER_SIZE:
+            raise ValueError("BlobHeader too large")
+        blob_header = dict(_iter_fields(f.read(header_size)))
+        if blob_header.get(1) != b'OSMHeader':
+            raise ValueError("File does not start with an OSMHeader block")
+        blob_size = blob_header.get(3, 0)
+        if blob_size > _MAX_BLOB_SIZE:
+            raise ValueError("Header blob too large")
+        blob = dict(_iter_fields(f.read(blob_size)))
+    
+    if 1 in blob:
+        header_block = blob[1]
+    elif 3 in blob:
+        header_block = zlib.decompress(blob[3])
+    else:
+        return None
+    
+    bbox = dict(_iter_fields(header_block)).get(1)
+    if bbox is None:
+        return None
+    # HeaderBBox: left, right, top, bottom as zigzag sint64 nanodegrees
+    edges = {field: ((value >> 1) ^ -(value & 1)) / 1e9 for field, value in _iter_fields(bbox)}
+    return {
+        'min_lon': edges[1], 'max_lon': edges[2],
+        'min_lat': edges[4], 'max_lat': edges[3]
+    }
+
 class PBFManager:
     """PBF file management utilities"""
     
@@ -18,54 +131,103 @@ class PBFManager:
         self.pbf_dir = pbf_dir
         self.pbf_dir.mkdir(exist_ok=True)
     
+    def _scan_pbf_entries(self) -> List[os.DirEntry]:
+        """PBF files in pbf_dir from one scandir pass, without fnmatch or Path objects"""
+        with os.scandir(self.pbf_dir) as entries:
+            # Same selection as glob("*.pbf"): no hidden files
+            return [entry for entry in entries
+                    if entry.name.endswith('.pbf') and not entry.name.startswith('.')
+                    and entry.is_file()]
+    
     def list_pbf_files(self) -> List[Path]:
         """List all PBF files"""
-        return list(self.pbf_dir.glob("*.pbf"))
+        return [Path(entry.path) for entry in self._scan_pbf_entries()]
     
-    def get_pbf_info(self, pbf_file: Path) -> Dict:
-        """Get PBF file information"""
-        if not pbf_file.exists():
-            return {}
+    def list_pbf_infos(self) -> List[Dict]:
+        """List all PBF files with their info from a single directory scan"""
+        pbf_entries = self._scan_pbf_entries()
         
-        size_mb = pbf_file.stat().st_size / (1024 * 1024)
-        mod_time = datetime.fromtimestamp(pbf_file.stat().st_mtime)
+        # Overlap the stat() round-trips when the directory is on a network share
+        if len(pbf_entries) > 1:
+            with ThreadPoolExecutor(max_workers=min(_STAT_WORKERS, len(pbf_entries))) as executor:
+                stats = list(executor.map(os.DirEntry.stat, pbf_entries))
+        else:
+            stats = [entry.stat() for entry in pbf_entries]
         
+        return [self._pbf_info(entry.name, st) for entry, st in zip(pbf_entries, stats)]
+    
+    def get_pbf_info(self, pbf_file: Union[Path, os.DirEntry]) -> Dict:
+        """Get PBF file information
+        
+        Takes a Path or a DirEntry from a directory scan, whose stat() is
+        cached on the entry.
+        """
+        # One stat for both size and mtime; it also stands in for exists()
+        try:
+            st = pbf_file.stat()
+        except OSError:
+            return {}
+        
+        return self._pbf_info(pbf_file.name, st)
+    
+    def _pbf_info(self, name: str, st: os.stat_result) -> Dict:
+        """Info dict for a PBF file from its stat result"""
         return {
-            'name': pbf_file.name,
-            'size_mb': size_mb,
-            'modified': mod_time.strftime('%Y-%m-%d %H:%M'),
-            'path': f"/pbf/{pbf_file.name}"
+            'name': name,
+            'size_mb': st.st_size / (1024 * 1024),
+            'modified': datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M'),
+            'path': f"/pbf/{name}"
         }
     
     def get_pbf_bounds(self, pbf_path: str) -> Optional[Dict]:
-        """Get PBF file geographic bounds (simplified approach)"""
-        pbf_filename = pbf_path.split('/')[-1].lower()
+        """Get PBF file geographic bounds
         
-        # Known bounds for common regions
-        known_bounds = {
-            'cyprus-latest.osm.pbf': {
-                'min_lon': 32.0, 'max_lon': 35.0,
-                'min_lat': 34.5, 'max_lat': 35.8
-            },
-            'turkey-latest.osm.pbf': {
-                'min_lon': 25.5, 'max_lon': 45.0,
-                'min_lat': 35.8, 'max_lat': 42.5
-            },
-            'greece-latest.osm.pbf': {
-                'min_lon': 19.0, 'max_lon': 30.0,
-                'min_lat': 34.0, 'max_lat': 42.0
-            },
-            'italy-latest.osm.pbf': {
-                'min_lon': 6.0, 'max_lon': 19.0,
-                'min_lat': 35.0, 'max_lat': 48.0
-            },
-            'germany-latest.osm.pbf': {
-                'min_lon': 5.5, 'max_lon': 15.5,
-                'min_lat': 47.0, 'max_lat': 55.5
-            }
-        }
+        Read from the file's header bbox when it has one, otherwise looked
+        up by file name among known regions.
+        """
+        name = pbf_path.split('/')[-1]
+        bounds = self._header_bounds(name)
+        if bounds is not None:
+            return bounds
+        
+        pbf_filename = name.lower()
+        return _KNOWN_BOUNDS.get(_DATE_RE.sub('-latest.osm.pbf', pbf_filename))
+    
+    def _header_bounds(self, name: str) -> Optional[Dict]:
+        """Header bounds of pbf_dir/name, cached in BOUNDS_CACHE_NAME by mtime and size"""
+        pbf_file = self.pbf_dir / name
+        try:
+            st = pbf_file.stat()
+        except OSError:
+            return None
+        stamp = [st.st_mtime_ns, st.st_size]
+        
+        cache_path = self.pbf_dir / BOUNDS_CACHE_NAME
+        try:
+            with open(cache_path, 'rb') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
         
-        return known_bounds.get(pbf_filename)
+        cached = cache.get(name)
+        if cached is not None and cached['stamp'] == stamp:
+            return cached['bounds']
+        
+        try:
+            bounds = read_pbf_header_bounds(pbf_file)
+        except (OSError, ValueError, KeyError, IndexError, struct.error, zlib.error) as e:
+            logger.warning(f"Could not read PBF header of {name}: {e}")
+            return None
+        
+        cache[name] = {'stamp': stamp, 'bounds': bounds}
+        try:
+            tmp_path = cache_path.with_name(BOUNDS_CACHE_NAME + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save PBF bounds cache {cache_path}: {e}")
+        return bounds
     
     def validate_bbox_against_pbf(self, bbox: Dict, pbf_bounds: Dict) -> bool:
         """Validate that bbox is within PBF bounds"""
@@ -76,31 +238,34 @@ class PBFManager:
     
     def validate_bbox_coordinates(self, bbox: Dict) -> bool:
         """Validate bbox coordinate values"""
+        return not self.bbox_coordinate_errors(bbox)
+    
+    def bbox_coordinate_errors(self, bbox: Dict) -> List[str]:
+        """Reasons the bbox coordinates are invalid, empty if they are valid
+        
+        Nothing is logged here; the caller reports the reasons, once,
+        however it sees fit.
+        """
         try:
             min_lon = float(bbox['min_lon'])
             max_lon = float(bbox['max_lon'])
             min_lat = float(bbox['min_lat'])
             max_lat = float(bbox['max_lat'])
-            
-            # Basic validation
-            if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
-                logger.error("Longitude must be between -180 and 180")
-                return False
-            
-            if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
-                logger.error("Latitude must be between -90 and 90")
-                return False
-            
-            if min_lon >= max_lon:
-                logger.error("Min longitude must be less than max longitude")
-                return False
-            
-            if min_lat >= max_lat:
-                logger.error("Min latitude must be less than max latitude")
-                return False
-            
-            return True
-            
         except (ValueError, KeyError, TypeError):
-            logger.error("Invalid bbox format")
-            return False
+            return ["Invalid bbox format"]
+        
+        # Ranges and ordering in one chained comparison per axis
+        if -180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90:
+            return []
+        
+        # Invalid: collect every rule that failed
+        reasons = []
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            reasons.append("Longitude must be between -180 and 180")
+        if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+            reasons.append("Latitude must be between -90 and 90")
+        if not min_lon < max_lon:
+            reasons.append("Min longitude must be less than max longitude")
+        if not min_lat < max_lat:
+            reasons.append("Min latitude must be less than max latitude")
+        return reasons
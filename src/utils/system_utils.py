@@ -5,60 +5,142 @@ System Utilities
 """
 
 import os
+import fnmatch
 import subprocess
 import time
 import logging
 from pathlib import Path
+from typing import Iterator
 
 logger = logging.getLogger(__name__)
 
+# Seconds a Docker probe result is reused before the CLI is run again
+PROBE_TTL = 5
+
+# How long start_containers waits for the services to come up; covers the
+# healthcheck start_period of a fresh postgres volume or a slow renderd
+START_TIMEOUT = 150
+
 class SystemUtils:
     """System and Docker utilities"""
     
+    # Last _probe() result and when it was taken
+    _docker_state = None
+    _docker_state_time = 0.0
+    
     @staticmethod
     def clear_screen():
         """Clear terminal screen"""
         os.system('cls' if os.name == 'nt' else 'clear')
     
-    @staticmethod
-    def check_docker() -> bool:
-        """Check if Docker is available"""
+    @classmethod
+    def _probe(cls) -> dict:
+        """Docker, Compose and container state from as few CLI calls as possible
+        
+        Compose availability comes from `compose version`, which works
+        without a running daemon or a compose file; the Compose plugin is
+        tried first and the standalone docker-compose only when it is
+        missing. 'compose_command' is the argv prefix that worked, and one
+        `ps` through it answers whether the containers are up. The result
+        is reused for PROBE_TTL seconds.
+        """
+        now = time.monotonic()
+        if cls._docker_state is not None and now - cls._docker_state_time < PROBE_TTL:
+            return cls._docker_state
+        
+        state = {'docker': False, 'compose': False, 'containers': False, 'compose_command': None}
         try:
-            result = subprocess.run(['docker', '--version'], 
+            result = subprocess.run(['docker', 'compose', 'version'],
                                   capture_output=True, text=True)
-            return result.returncode == 0
+            state['docker'] = True
+            if result.returncode == 0:
+                state['compose_command'] = ['docker', 'compose']
         except FileNotFoundError:
-            return False
+            pass
+        
+        if state['docker'] and state['compose_command'] is None:
+            # No Compose plugin: try the standalone binary
+            try:
+                result = subprocess.run(['docker-compose', 'version'],
+                                      capture_output=True, text=True)
+                if result.returncode == 0:
+                    state['compose_command'] = ['docker-compose']
+            except FileNotFoundError:
+                pass
+        
+        if state['compose_command'] is not None:
+            state['compose'] = True
+            try:
+                result = subprocess.run(state['compose_command'] + ['ps'],
+                                      capture_output=True, text=True)
+                state['containers'] = result.returncode == 0 and "osm_tools" in result.stdout
+            except OSError:
+                pass
+        
+        cls._docker_state = state
+        cls._docker_state_time = now
+        return state
+    
+    @staticmethod
+    def check_docker() -> bool:
+        """Check if Docker is available"""
+        return SystemUtils._probe()['docker']
     
     @staticmethod
     def check_docker_compose() -> bool:
         """Check if Docker Compose is available"""
-        try:
-            result = subprocess.run(['docker-compose', '--version'], 
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        return SystemUtils._probe()['compose']
     
     @staticmethod
     def check_containers() -> bool:
         """Check if OSM containers are running"""
-        try:
-            result = subprocess.run(['docker-compose', 'ps'], 
-                                  capture_output=True, text=True)
-            return "osm_tools" in result.stdout
-        except Exception:
-            return False
+        return SystemUtils._probe()['containers']
     
     @staticmethod
     def start_containers() -> bool:
-        """Start Docker containers"""
+        """Start Docker containers, returning once they are up"""
+        # Deferred: docker_manager pulls in http.client, which only this method needs
+        from .docker_manager import COMPOSE_WAIT_UNSUPPORTED, HEALTH_FORMAT, SERVICE_CONTAINERS
+        
+        compose = SystemUtils._probe()['compose_command'] or ['docker-compose']
         try:
             logger.info("Starting Docker containers...")
-            subprocess.run(['docker-compose', 'up', '-d'], 
-                         capture_output=True, text=True)
-            time.sleep(5)
-            return True
+            # Compose blocks until every healthcheck passes
+            result = subprocess.run(compose + ['up', '-d', '--wait', '--wait-timeout', str(START_TIMEOUT)],
+                                  capture_output=True, text=True)
+            # Container state changed; the next check must probe again
+            SystemUtils._docker_state = None
+            if result.returncode == 0:
+                return True
+            if not any(text in result.stderr for text in COMPOSE_WAIT_UNSUPPORTED):
+                logger.error(f"Failed to start containers: {result.stderr.strip()}")
+                return False
+            
+            # Compose v1 has no --wait: start detached and poll the healthchecks
+            result = subprocess.run(compose + ['up', '-d'], 
+                                  capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"Failed to start containers: {result.stderr.strip()}")
+                return False
+            
+            # One inspect reads every service's health; running only counts
+            # for containers created before the healthchecks existed
+            deadline = time.monotonic() + START_TIMEOUT
+            while time.monotonic() < deadline:
+                result = subprocess.run(['docker', 'inspect', '--format', HEALTH_FORMAT,
+                                         *SERVICE_CONTAINERS],
+                                      capture_output=True, text=True)
+                statuses = result.stdout.split()
+                if 'unhealthy' in statuses:
+                    logger.error("Containers failed their healthchecks")
+                    return False
+                if (result.returncode == 0 and len(statuses) == len(SERVICE_CONTAINERS) and
+                        all(status in ('healthy', 'running') for status in statuses)):
+                    return True
+                time.sleep(0.5)
+            
+            logger.error("Containers did not come up in time")
+            return False
         except Exception as e:
             logger.error(f"Failed to start containers: {e}")
             return False
@@ -84,19 +166,44 @@ class SystemUtils:
         logger.info("System check completed.")
         return True
     
+    @staticmethod
+    def _iter_files(directory: Path) -> Iterator[os.DirEntry]:
+        """Every file below directory, as scandir entries
+        
+        DirEntry carries the file type from the directory listing, so no
+        Path objects are built and no extra stat is needed to tell files
+        from directories. Directory symlinks are not followed.
+        """
+        stack = [os.fspath(directory)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+            except OSError:
+                continue
+    
     @staticmethod
     def get_directory_size(directory: Path) -> float:
         """Get directory size in MB"""
         if not directory.exists():
             return 0.0
         
-        total_size = sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
+        total_size = sum(entry.stat().st_size for entry in SystemUtils._iter_files(directory))
         return total_size / (1024 * 1024)
     
     @staticmethod
     def count_files(directory: Path, pattern: str = "*") -> int:
-        """Count files in directory matching pattern"""
+        """Count files in directory matching pattern (matched against file names)"""
         if not directory.exists():
             return 0
         
-        return len(list(directory.rglob(pattern)))
+        if pattern == "*":
+            return sum(1 for _ in SystemUtils._iter_files(directory))
+        
+        # fnmatch keeps the compiled pattern cached and is case-insensitive on Windows, like rglob
+        return sum(1 for entry in SystemUtils._iter_files(directory)
+                   if fnmatch.fnmatch(entry.name, pattern))
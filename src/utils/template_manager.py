@@ -6,14 +6,172 @@ Template Manager for OSM Tile Generator
 This module provides functionality for generating and managing configuration templates.
 """
 
+import copy
+import functools
 import json
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
 
 logger = logging.getLogger(__name__)
 
+# Default template.json structure; handed out as deep copies
+_DEFAULT_TEMPLATE = {
+    "name": "",
+    "description": "",
+    "pbf_path": "",
+    "render_type": "bbox",
+    "bbox": {
+        "min_lon": 0.0,
+        "min_lat": 0.0,
+        "max_lon": 0.0,
+        "max_lat": 0.0
+    },
+    "zoom_levels": {
+        "min_zoom": 0,
+        "max_zoom": 12
+    },
+    "style": "osm-carto",
+    "output_format": "png",
+    "tile_size": 256,
+    "created_at": ""
+}
+
+# Predefined sample configurations by sample name
+_SAMPLE_CONFIGS = {
+    "cyprus_sample": {
+        "name": "cyprus_sample",
+        "description": "Cyprus island sample configuration",
+        "pbf_path": "/pbf/cyprus-latest.osm.pbf",
+        "render_type": "bbox",
+        "bbox": {
+            "min_lon": 32.2,
+            "min_lat": 34.5,
+            "max_lon": 34.7,
+            "max_lat": 35.7
+        },
+        "zoom_levels": {
+            "min_zoom": 0,
+            "max_zoom": 14
+        },
+        "style": "osm-carto",
+        "output_format": "png",
+        "tile_size": 256
+    },
+    "turkey_sample": {
+        "name": "turkey_sample", 
+        "description": "Turkey sample configuration",
+        "pbf_path": "/pbf/turkey-latest.osm.pbf",
+        "render_type": "bbox",
+        "bbox": {
+            "min_lon": 26.0,
+            "min_lat": 36.0,
+            "max_lon": 45.0,
+            "max_lat": 42.0
+        },
+        "zoom_levels": {
+            "min_zoom": 0,
+            "max_zoom": 12
+        },
+        "style": "osm-carto",
+        "output_format": "png",
+        "tile_size": 256
+    },
+    "greece_sample": {
+        "name": "greece_sample",
+        "description": "Greece sample configuration",
+        "pbf_path": "/pbf/greece-latest.osm.pbf",
+        "render_type": "bbox",
+        "bbox": {
+            "min_lon": 19.0,
+            "min_lat": 34.0,
+            "max_lon": 30.0,
+            "max_lat": 42.0
+        },
+        "zoom_levels": {
+            "min_zoom": 0,
+            "max_zoom": 13
+        },
+        "style": "osm-carto",
+        "output_format": "png",
+        "tile_size": 256
+    },
+    "italy_sample": {
+        "name": "italy_sample",
+        "description": "Italy sample configuration", 
+        "pbf_path": "/pbf/italy-latest.osm.pbf",
+        "render_type": "bbox",
+        "bbox": {
+            "min_lon": 6.0,
+            "min_lat": 35.0,
+            "max_lon": 19.0,
+            "max_lat": 48.0
+        },
+        "zoom_levels": {
+            "min_zoom": 0,
+            "max_zoom": 12
+        },
+        "style": "osm-carto",
+        "output_format": "png",
+        "tile_size": 256
+    }
+}
+
+# Parsed configs kept per TemplateManager; the oldest entry is dropped beyond this
+_CONFIG_CACHE_SIZE = 256
+
+# Structure checked by TemplateManager.validate_config_structure
+_STRUCTURE_SCHEMA = {
+    "type": "object",
+    "required": ["name", "render_type", "bbox", "zoom_levels",
+                 "style", "output_format", "tile_size"],
+    "properties": {
+        "name": {"type": "string"},
+        "render_type": {"type": "string"},
+        "bbox": {
+            "type": "object",
+            "required": ["min_lon", "min_lat", "max_lon", "max_lat"],
+            "properties": {
+                "min_lon": {"type": "number"},
+                "min_lat": {"type": "number"},
+                "max_lon": {"type": "number"},
+                "max_lat": {"type": "number"}
+            }
+        },
+        "zoom_levels": {
+            "type": "object",
+            "required": ["min_zoom", "max_zoom"],
+            "properties": {
+                "min_zoom": {"type": "integer"},
+                "max_zoom": {"type": "integer"}
+            }
+        },
+        "tile_size": {"type": "integer"}
+    }
+}
+
+@functools.lru_cache(maxsize=None)
+def _structure_validator():
+    """Compile _STRUCTURE_SCHEMA on first use
+    
+    jsonschema is imported here rather than at module load: it is the
+    slowest import in this module and listing or writing templates never
+    needs it.
+    """
+    from jsonschema import Draft7Validator
+    return Draft7Validator(_STRUCTURE_SCHEMA)
+
 class TemplateManager:
     """Manages configuration templates and sample configurations"""
     
@@ -30,29 +188,12 @@ class TemplateManager:
         
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(exist_ok=True)
+        # Valid configs by path: ((st_mtime_ns, st_size), config)
+        self._config_cache: Dict[Path, Tuple[Tuple[int, int], Dict]] = {}
     
     def get_default_template(self) -> Dict:
         """Get the default template configuration structure"""
-        return {
-            "name": "",
-            "description": "",
-            "pbf_path": "",
-            "render_type": "bbox",
-            "bbox": {
-                "min_lon": 0.0,
-                "min_lat": 0.0,
-                "max_lon": 0.0,
-                "max_lat": 0.0
-            },
-            "zoom_levels": {
-                "min_zoom": 0,
-                "max_zoom": 12
-            },
-            "style": "osm-carto",
-            "output_format": "png",
-            "tile_size": 256,
-            "created_at": ""
-        }
+        return copy.deepcopy(_DEFAULT_TEMPLATE)
     
     def create_template_file(self, filename: str = None) -> Optional[str]:
         """Create a new template file
@@ -87,8 +228,7 @@ class TemplateManager:
         template_config = self.get_default_template()
         
         try:
-            with open(template_file, 'w', encoding='utf-8') as f:
-                json.dump(template_config, f, indent=2, ensure_ascii=False)
+            template_file.write_bytes(_dumps(template_config))
             
             logger.info(f"Template file created successfully: {filename}")
             return filename
@@ -96,86 +236,14 @@ class TemplateManager:
             logger.error(f"Failed to create template file: {e}")
             return None
     
-    def get_sample_configs(self) -> Dict[str, Dict]:
-        """Get predefined sample configurations"""
-        return {
-            "cyprus_sample": {
-                "name": "cyprus_sample",
-                "description": "Cyprus island sample configuration",
-                "pbf_path": "/pbf/cyprus-latest.osm.pbf",
-                "render_type": "bbox",
-                "bbox": {
-                    "min_lon": 32.2,
-                    "min_lat": 34.5,
-                    "max_lon": 34.7,
-                    "max_lat": 35.7
-                },
-                "zoom_levels": {
-                    "min_zoom": 0,
-                    "max_zoom": 14
-                },
-                "style": "osm-carto",
-                "output_format": "png",
-                "tile_size": 256
-            },
-            "turkey_sample": {
-                "name": "turkey_sample", 
-                "description": "Turkey sample configuration",
-                "pbf_path": "/pbf/turkey-latest.osm.pbf",
-                "render_type": "bbox",
-                "bbox": {
-                    "min_lon": 26.0,
-                    "min_lat": 36.0,
-                    "max_lon": 45.0,
-                    "max_lat": 42.0
-                },
-                "zoom_levels": {
-                    "min_zoom": 0,
-                    "max_zoom": 12
-                },
-                "style": "osm-carto",
-                "output_format": "png",
-                "tile_size": 256
-            },
-            "greece_sample": {
-                "name": "greece_sample",
-                "description": "Greece sample configuration",
-                "pbf_path": "/pbf/greece-latest.osm.pbf",
-                "render_type": "bbox",
-                "bbox": {
-                    "min_lon": 19.0,
-                    "min_lat": 34.0,
-                    "max_lon": 30.0,
-                    "max_lat": 42.0
-                },
-                "zoom_levels": {
-                    "min_zoom": 0,
-                    "max_zoom": 13
-                },
-                "style": "osm-carto",
-                "output_format": "png",
-                "tile_size": 256
-            },
-            "italy_sample": {
-                "name": "italy_sample",
-                "description": "Italy sample configuration", 
-                "pbf_path": "/pbf/italy-latest.osm.pbf",
-                "render_type": "bbox",
-                "bbox": {
-                    "min_lon": 6.0,
-                    "min_lat": 35.0,
-                    "max_lon": 19.0,
-                    "max_lat": 48.0
-                },
-                "zoom_levels": {
-                    "min_zoom": 0,
-                    "max_zoom": 12
-                },
-                "style": "osm-carto",
-                "output_format": "png",
-                "tile_size": 256
-            }
-        }
+    def get_sample_configs(self, readonly: bool = False) -> Dict[str, Dict]:
+        """Get predefined sample configurations
+        
+        Args:
+            readonly: Return the shared module-level dict instead of a deep
+                copy; the caller must not modify it
+        """
+        return _SAMPLE_CONFIGS if readonly else copy.deepcopy(_SAMPLE_CONFIGS)
     
     def create_sample_configs(self, samples: List[str] = None) -> int:
         """Create sample configuration files
@@ -186,12 +254,13 @@ class TemplateManager:
         Returns:
             Number of successfully created samples
         """
-        all_samples = self.get_sample_configs()
+        # Read-only is safe here: _write_sample copies before adding created_at
+        all_samples = self.get_sample_configs(readonly=True)
         
         if samples is None:
             samples = list(all_samples.keys())
         
-        created_count = 0
+        to_create = []
         for sample_name in samples:
             if sample_name not in all_samples:
                 logger.warning(f"Unknown sample: {sample_name}")
@@ -201,20 +270,31 @@ class TemplateManager:
             if config_file.exists():
                 logger.warning(f"Sample already exists: {sample_name}.json")
                 continue
-                
-            try:
-                config = all_samples[sample_name].copy()
-                config['created_at'] = datetime.now().isoformat()
-                
-                with open(config_file, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, indent=2, ensure_ascii=False)
-                
-                created_count += 1
-                logger.info(f"Sample config created: {sample_name}.json")
-            except Exception as e:
-                logger.error(f"Failed to create sample {sample_name}: {e}")
+            
+            to_create.append((sample_name, all_samples[sample_name]))
+        
+        if not to_create:
+            return 0
         
-        return created_count
+        # Each sample is its own file, so the writes can overlap
+        with ThreadPoolExecutor(max_workers=len(to_create)) as executor:
+            results = executor.map(lambda sample: self._write_sample(*sample), to_create)
+            return sum(results)
+    
+    def _write_sample(self, sample_name: str, sample_config: Dict) -> bool:
+        """Write one sample configuration file, True on success"""
+        config_file = self.config_dir / f"{sample_name}.json"
+        try:
+            config = sample_config.copy()
+            config['created_at'] = datetime.now().isoformat()
+            
+            config_file.write_bytes(_dumps(config))
+            
+            logger.info(f"Sample config created: {sample_name}.json")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create sample {sample_name}: {e}")
+            return False
     
     def create_custom_config(self, name: str, config_data: Dict) -> bool:
         """Create a custom configuration file
@@ -236,8 +316,7 @@ class TemplateManager:
             config_data = config_data.copy()
             config_data['created_at'] = datetime.now().isoformat()
             
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            config_file.write_bytes(_dumps(config_data))
             
             logger.info(f"Custom config created: {name}")
             return True
@@ -261,28 +340,12 @@ class TemplateManager:
         Returns:
             True if valid, False otherwise
         """
-        required_fields = [
-            'name', 'render_type', 'bbox', 'zoom_levels',
-            'style', 'output_format', 'tile_size'
-        ]
-        
-        for field in required_fields:
-            if field not in config:
-                logger.error(f"Missing required field: {field}")
-                return False
-        
-        # Validate bbox structure
-        bbox = config.get('bbox', {})
-        bbox_fields = ['min_lon', 'min_lat', 'max_lon', 'max_lat']
-        for field in bbox_fields:
-            if field not in bbox:
-                logger.error(f"Missing bbox field: {field}")
-                return False
-        
-        # Validate zoom levels
-        zoom = config.get('zoom_levels', {})
-        if 'min_zoom' not in zoom or 'max_zoom' not in zoom:
-            logger.error("Missing zoom level fields")
+        # Only the first error is reported, as before
+        error = next(_structure_validator().iter_errors(config), None)
+        if error is not None:
+            location = "/".join(str(part) for part in error.absolute_path)
+            logger.error(f"Invalid config field {location}: {error.message}" if location
+                         else f"Invalid config: {error.message}")
             return False
         
         return True
@@ -295,6 +358,9 @@ class TemplateManager:
             
         Returns:
             Configuration dictionary or None if failed
+        
+        Valid configs are cached until the file's mtime or size changes. Each
+        caller gets its own copy, so mutating it never leaks into the cache.
         """
         if not filename.endswith('.json'):
             filename += '.json'
@@ -302,11 +368,22 @@ class TemplateManager:
         config_file = self.config_dir / filename
         
         try:
+            st = config_file.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._config_cache.get(config_file)
+            if cached is not None and cached[0] == stamp:
+                return copy.deepcopy(cached[1])
+            
             with open(config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
             
             if self.validate_config_structure(config):
-                return config
+                self._config_cache.pop(config_file, None)
+                if len(self._config_cache) >= _CONFIG_CACHE_SIZE:
+                    # Dicts keep insertion order: the first key is the oldest
+                    del self._config_cache[next(iter(self._config_cache))]
+                self._config_cache[config_file] = (stamp, config)
+                return copy.deepcopy(config)
             else:
                 logger.error(f"Invalid config structure in {filename}")
                 return None
@@ -4,44 +4,267 @@
 Tile Validation and Recovery Utilities
 """
 
+import os
 import logging
 import math
 import time
-import subprocess
 import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+# Signature + IHDR + IEND: anything smaller is truncated or empty
+MIN_PNG_SIZE = 67
+
+# Sidecar in the output directory, kept by strict validators only: tiles whose PNG
+# signature was verified, keyed by "z/x/y.png" with the [mtime_ns, size] they had
+# at the time
+VALIDATION_CACHE_NAME = ".validated.json"
+
+# Tile columns checked concurrently; validation is stat/open/read calls that
+# release the GIL, so several can wait on the disk at once
+VALIDATION_WORKERS = 8
+
+# Concurrent tile requests during recovery; keep at or below renderd's num_threads
+DOWNLOAD_WORKERS = 8
+
+# Work items queued on a pool at once, per worker thread
+QUEUE_DEPTH = 4
+
+def _map_bounded(executor, fn, items, limit: int) -> Iterator:
+    """Yield fn(item) for every item, in input order
+    
+    Unlike executor.map, which submits every item up front, at most `limit`
+    items are queued at a time and the next is submitted as the oldest
+    result is taken, so memory stays flat however large the tree.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
 class TileValidator:
     """Validate and manage tile completeness"""
     
-    def __init__(self, output_dir: Path):
-        self.output_dir = output_dir
+    def __init__(self, output_dir: Union[str, Path], strict: bool = False):
+        """With `strict`, tiles must also carry the PNG signature; otherwise
+        a tile of at least MIN_PNG_SIZE bytes is accepted on its stat alone.
+        Downloads always check the signature before a tile is written.
+        """
+        # Path for the download side, plain string prefix for the scan loops
+        self.output_dir = Path(output_dir)
+        self.strict = strict
+        self._output_base = os.fspath(output_dir)
+        self._cache_path = self.output_dir / VALIDATION_CACHE_NAME
+        self._validated = None
+        self._cache_dirty = False
+        # Keep-alive connections to the tile server, one per download thread
+        self._local = threading.local()
+        # Per-zoom tile ranges by (bbox, min_zoom, max_zoom), shared by the
+        # quick and detailed reports
+        self._expected_cache = {}
     
-    def validate_tile(self, tile_path: Path) -> bool:
-        """Validate if a tile is complete and valid"""
-        if not tile_path.exists():
+    def validate_tile(self, tile_path: Path, strict: Optional[bool] = None) -> bool:
+        """Validate if a tile is complete and valid
+        
+        The size check catches the usual failure (empty or truncated files)
+        with one stat; `strict` also reads the PNG signature and defaults to
+        the validator's own mode.
+        """
+        if strict is None:
+            strict = self.strict
+        try:
+            st = os.stat(tile_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Error validating tile {tile_path}: {e}")
             return False
         
+        if st.st_size < MIN_PNG_SIZE:
+            return False
+        return self._has_png_header(tile_path) if strict else True
+    
+    def _has_png_header(self, tile_path: Path) -> bool:
+        """Check the PNG signature"""
         try:
-            # PNG header check
-            with open(tile_path, 'rb') as f:
-                header = f.read(8)
-                if header != b'\x89PNG\r\n\x1a\n':
-                    return False
-            
-            return True
-            
-        except Exception as e:
+            # PNG header check with a raw fd (no buffered reader per tile)
+            fd = os.open(tile_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
             logger.warning(f"Error validating tile {tile_path}: {e}")
             return False
+        
+        try:
+            return os.read(fd, 8) == PNG_MAGIC
+        except OSError as e:
+            logger.warning(f"Error validating tile {tile_path}: {e}")
+            return False
+        finally:
+            os.close(fd)
+    
+    def _load_validation_cache(self) -> Dict[str, List[int]]:
+        """Load the validation sidecar once per validator; strict mode only"""
+        if self._validated is None:
+            try:
+                with open(self._cache_path, 'rb') as f:
+                    self._validated = json.load(f)
+            except (OSError, ValueError):
+                self._validated = {}
+        return self._validated
+    
+    def _save_validation_cache(self):
+        """Write the validation sidecar back if it changed"""
+        if not self._cache_dirty or not self._cache_path.parent.exists():
+            return
+        
+        tmp_path = self._cache_path.with_name(VALIDATION_CACHE_NAME + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._validated, f)
+            os.replace(tmp_path, self._cache_path)
+            self._cache_dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save validation cache {self._cache_path}: {e}")
+    
+    def _validate_entry(self, entry: os.DirEntry, key: str) -> bool:
+        """validate_tile in this validator's mode for a tile from a column listing
+        
+        The size comes from the DirEntry's stat, which is cached on the entry
+        and free on Windows, where it arrives with the directory listing. The
+        sidecar only holds tiles whose signature was verified, so strict mode
+        skips the header read for tiles unchanged since they passed; the
+        default mode never touches it.
+        """
+        try:
+            st = entry.stat()
+        except OSError:
+            st = None
+        
+        if not self.strict:
+            return st is not None and st.st_size >= MIN_PNG_SIZE
+        
+        cache = self._load_validation_cache()
+        if st is None or st.st_size < MIN_PNG_SIZE:
+            if cache.pop(key, None) is not None:
+                self._cache_dirty = True
+            return False
+        
+        stamp = [st.st_mtime_ns, st.st_size]
+        if cache.get(key) == stamp:
+            return True
+        
+        # New or rewritten since the last validation: check the header
+        valid = self._has_png_header(entry.path)
+        if valid:
+            cache[key] = stamp
+            self._cache_dirty = True
+        elif cache.pop(key, None) is not None:
+            self._cache_dirty = True
+        return valid
+    
+    def _missing_in_column(self, zoom: int, x: int, min_y: int, max_y: int,
+                           column_exists: bool = True) -> Tuple[int, int, List[int]]:
+        """(zoom, x, missing ys) for one tile column, listing its directory once
+        
+        Tiles absent from the listing are reported invalid without a stat, so
+        sparse or not yet rendered columns cost one scandir instead of one
+        syscall per expected tile. A column its zoom listing did not contain
+        (`column_exists` False) is all missing without touching the disk.
+        """
+        # Plain string path; tiles found here are handled through their DirEntry
+        column_dir = f"{self._output_base}/{zoom}/{x}"
+        present = {}
+        if column_exists:
+            try:
+                with os.scandir(column_dir) as entries:
+                    present = {entry.name: entry for entry in entries}
+            except OSError:
+                pass
+        
+        # Only strict mode keeps the sidecar, and with it stale keys to drop
+        cache = self._load_validation_cache() if self.strict else None
+        prefix = f"{zoom}/{x}/"
+        missing = []
+        for y in range(min_y, max_y + 1):
+            name = f"{y}.png"
+            entry = present.get(name)
+            if entry is not None:
+                if not self._validate_entry(entry, prefix + name):
+                    missing.append(y)
+            else:
+                if cache is not None and cache.pop(prefix + name, None) is not None:
+                    self._cache_dirty = True
+                missing.append(y)
+        return zoom, x, missing
+    
+    def _iter_columns(self, zoom_ranges) -> Iterator[Tuple[int, int, List[int]]]:
+        """_missing_in_column for every column of zoom_ranges, in order
+        
+        Columns are checked on a thread pool, at most QUEUE_DEPTH per worker
+        queued at a time; each one touches its own sidecar keys, so the
+        workers share the loaded cache dict.
+        """
+        if self.strict:
+            self._load_validation_cache()
+        columns = []
+        for zoom, min_x, max_x, min_y, max_y in zoom_ranges:
+            # One listing per zoom level tells which columns exist at all
+            try:
+                with os.scandir(f"{self._output_base}/{zoom}") as entries:
+                    present_columns = {entry.name for entry in entries}
+            except OSError:
+                present_columns = set()
+            columns.extend((zoom, x, min_y, max_y, str(x) in present_columns)
+                           for x in range(min_x, max_x + 1))
+        if len(columns) < 2:
+            yield from (self._missing_in_column(*column) for column in columns)
+            return
+        
+        workers = min(VALIDATION_WORKERS, len(columns))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from _map_bounded(executor, lambda column: self._missing_in_column(*column),
+                                    columns, workers * QUEUE_DEPTH)
     
     def find_missing_tiles(self, config: Dict) -> List[Tuple[int, int, int]]:
         """Find missing or invalid tiles based on config"""
-        missing_tiles = []
+        return list(self._iter_missing_tiles(config))
+    
+    def has_missing_tiles(self, config: Dict) -> bool:
+        """Check whether any tile is missing or invalid, stopping at the first"""
+        missing = self._iter_missing_tiles(config)
+        try:
+            return next(missing, None) is not None
+        finally:
+            missing.close()
+    
+    def _iter_missing_tiles(self, config: Dict) -> Iterator[Tuple[int, int, int]]:
+        """Yield missing or invalid tiles in (zoom, x, y) order"""
+        zoom_ranges = self._zoom_ranges(config)
+        if zoom_ranges is None:
+            logger.warning("Only bbox validation is supported")
+            return
         
+        try:
+            for zoom, x, missing in self._iter_columns(zoom_ranges):
+                for y in missing:
+                    yield (zoom, x, y)
+        finally:
+            self._save_validation_cache()
+    
+    def _zoom_ranges(self, config: Dict) -> Optional[Tuple[Tuple[int, int, int, int, int], ...]]:
+        """(zoom, min_x, max_x, min_y, max_y) per zoom level, None unless bbox render"""
         bbox = config.get('bbox')
         render_type = config.get('render_type', 'bbox')
         zoom_levels = config.get('zoom_levels', {})
@@ -49,81 +272,69 @@ class TileValidator:
         max_zoom = zoom_levels.get('max_zoom', 12)
         
         if render_type != 'bbox' or not bbox:
-            logger.warning("Only bbox validation is supported")
-            return missing_tiles
+            return None
+        
+        cache_key = (bbox['min_lat'], bbox['min_lon'], bbox['max_lat'], bbox['max_lon'],
+                     min_zoom, max_zoom)
+        zoom_ranges = self._expected_cache.get(cache_key)
+        if zoom_ranges is not None:
+            return zoom_ranges
         
+        # Project the bbox corners once (same math as TileGenerator.zoom_bounds);
+        # each zoom level only rescales them
+        west = (bbox['min_lon'] + 180.0) / 360.0
+        east = (bbox['max_lon'] + 180.0) / 360.0
+        south = (1.0 - math.asinh(math.tan(math.radians(bbox['min_lat']))) / math.pi) / 2.0
+        north = (1.0 - math.asinh(math.tan(math.radians(bbox['max_lat']))) / math.pi) / 2.0
+        
+        zoom_ranges = []
         for zoom in range(min_zoom, max_zoom + 1):
-            min_x, max_y = self._deg2num(bbox['min_lat'], bbox['min_lon'], zoom)
-            max_x, min_y = self._deg2num(bbox['max_lat'], bbox['max_lon'], zoom)
+            n = 2.0 ** zoom
+            min_x, max_y = int(west * n), int(south * n)
+            max_x, min_y = int(east * n), int(north * n)
             
             # Ensure bounds
-            max_tiles = 2 ** zoom
-            min_x = max(0, min_x)
-            max_x = min(max_tiles - 1, max_x)
-            min_y = max(0, min_y)
-            max_y = min(max_tiles - 1, max_y)
+            last = (1 << zoom) - 1
+            min_x = 0 if min_x < 0 else min_x
+            max_x = last if max_x > last else max_x
+            min_y = 0 if min_y < 0 else min_y
+            max_y = last if max_y > last else max_y
             
-            for x in range(min_x, max_x + 1):
-                for y in range(min_y, max_y + 1):
-                    tile_path = self.output_dir / str(zoom) / str(x) / f"{y}.png"
-                    
-                    if not self.validate_tile(tile_path):
-                        missing_tiles.append((zoom, x, y))
-        
-        return missing_tiles
-    
-    def _deg2num(self, lat_deg: float, lon_deg: float, zoom: int) -> Tuple[int, int]:
-        """Convert coordinates to tile numbers"""
-        lat_rad = math.radians(lat_deg)
-        n = 2.0 ** zoom
-        x = int((lon_deg + 180.0) / 360.0 * n)
-        y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
-        return (x, y)
+            zoom_ranges.append((zoom, min_x, max_x, min_y, max_y))
+        
+        zoom_ranges = self._expected_cache[cache_key] = tuple(zoom_ranges)
+        return zoom_ranges
     
     def calculate_expected_tiles(self, config: Dict) -> int:
         """Calculate total expected tiles for config"""
-        bbox = config.get('bbox')
-        render_type = config.get('render_type', 'bbox')
-        zoom_levels = config.get('zoom_levels', {})
-        min_zoom = zoom_levels.get('min_zoom', 0)
-        max_zoom = zoom_levels.get('max_zoom', 12)
-        
-        if render_type != 'bbox' or not bbox:
+        zoom_ranges = self._zoom_ranges(config)
+        if zoom_ranges is None:
             return 0
         
-        total_tiles = 0
-        for zoom in range(min_zoom, max_zoom + 1):
-            min_x, max_y = self._deg2num(bbox['min_lat'], bbox['min_lon'], zoom)
-            max_x, min_y = self._deg2num(bbox['max_lat'], bbox['max_lon'], zoom)
-            
-            # Ensure bounds
-            max_tiles = 2 ** zoom
-            min_x = max(0, min_x)
-            max_x = min(max_tiles - 1, max_x)
-            min_y = max(0, min_y)
-            max_y = min(max_tiles - 1, max_y)
-            
-            tiles_this_zoom = (max_x - min_x + 1) * (max_y - min_y + 1)
-            total_tiles += tiles_this_zoom
-        
-        return total_tiles
+        return sum((max_x - min_x + 1) * (max_y - min_y + 1)
+                   for _, min_x, max_x, min_y, max_y in zoom_ranges)
     
-    def get_validation_report(self, config: Dict) -> Dict:
-        """Get comprehensive validation report"""
+    def get_validation_report(self, config: Dict, preview_count: Optional[int] = None) -> Dict:
+        """Get comprehensive validation report
+        
+        With `preview_count`, 'missing_tiles' holds at most that many tiles
+        while 'missing' is still the full count. Every expected tile is checked
+        exactly once, so 'valid' is whatever that pass did not report missing.
+        """
         expected_tiles = self.calculate_expected_tiles(config)
-        missing_tiles = self.find_missing_tiles(config)
+        missing_count = 0
+        missing_tiles = []
+        for tile in self._iter_missing_tiles(config):
+            missing_count += 1
+            if preview_count is None or len(missing_tiles) < preview_count:
+                missing_tiles.append(tile)
         
-        # Count valid tiles
-        valid_tiles = 0
-        if self.output_dir.exists():
-            for tile_file in self.output_dir.rglob("*.png"):
-                if self.validate_tile(tile_file):
-                    valid_tiles += 1
+        valid_tiles = expected_tiles - missing_count
         
         return {
             'expected': expected_tiles,
             'valid': valid_tiles,
-            'missing': len(missing_tiles),
+            'missing': missing_count,
             'missing_tiles': missing_tiles,
             'completion_rate': (valid_tiles / expected_tiles * 100) if expected_tiles > 0 else 0
         }
@@ -141,24 +352,57 @@ class TileValidator:
         
         success_count = 0
         final_failures = []
+        # Loaded up front so the download threads only assign into it; only
+        # strict mode reads the stamps back
+        cache = self._load_validation_cache() if self.strict else None
+        # Column directories already created in this batch
+        ensured_dirs = set()
         
-        for i, (zoom, x, y) in enumerate(missing_tiles, 1):
+        def download(tile):
+            zoom, x, y = tile
             tile_dir = self.output_dir / str(zoom) / str(x)
-            tile_dir.mkdir(parents=True, exist_ok=True)
+            if (zoom, x) not in ensured_dirs:
+                tile_dir.mkdir(parents=True, exist_ok=True)
+                ensured_dirs.add((zoom, x))
             
             tile_path = tile_dir / f"{y}.png"
             tile_url = f"{base_url}/{zoom}/{x}/{y}.png"
             
             # Try to download with enhanced retry
-            if self._download_tile_with_retry(tile_url, tile_path, max_retries=10):
-                success_count += 1
-            else:
-                final_failures.append((zoom, x, y))
+            if not self._download_tile_with_retry(tile_url, tile_path, max_retries=10):
+                return False
             
-            # Status update every 50 tiles
-            if i % 50 == 0 or i == len(missing_tiles):
-                success_rate = (success_count / i * 100)
-                logger.info(f"Progress: {i}/{len(missing_tiles)} tiles processed ({success_rate:.1f}% success)")
+            # The body passed the PNG check before it was renamed into place;
+            # stamp it so the follow-up validation skips the header read
+            if cache is None:
+                return True
+            try:
+                st = os.stat(tile_path)
+            except OSError:
+                return True
+            cache[f"{zoom}/{x}/{y}.png"] = [st.st_mtime_ns, st.st_size]
+            self._cache_dirty = True
+            return True
+        
+        # Column by column, so neighbouring tiles share a directory and metatile
+        missing_tiles = sorted(missing_tiles)
+        
+        # Several requests in flight over pooled keep-alive connections
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            results = _map_bounded(executor, download, missing_tiles,
+                                   DOWNLOAD_WORKERS * QUEUE_DEPTH)
+            for i, (tile, success) in enumerate(zip(missing_tiles, results), 1):
+                if success:
+                    success_count += 1
+                else:
+                    final_failures.append(tile)
+                
+                # Status update every 50 tiles
+                if i % 50 == 0 or i == len(missing_tiles):
+                    success_rate = (success_count / i * 100)
+                    logger.info(f"Progress: {i}/{len(missing_tiles)} tiles processed ({success_rate:.1f}% success)")
+        
+        self._save_validation_cache()
         
         logger.info(f"Download completed: {success_count} successful, {len(final_failures)} failed")
         
@@ -169,31 +413,56 @@ class TileValidator:
         
         return success_count
     
+    def _fetch_tile(self, tile_url: str, tile_path: Path) -> bool:
+        """GET one tile over this thread's keep-alive connection
+        
+        The body is checked for the PNG signature in memory and written to
+        '<tile>.tmp' before being renamed into place, so error pages and
+        partial files never land in the tile tree.
+        """
+        # Imported on first download; validation-only runs never load it
+        import http.client
+        
+        url = urlsplit(tile_url)
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        connection = connections.get(url.netloc)
+        if connection is None:
+            connection = connections[url.netloc] = http.client.HTTPConnection(url.netloc, timeout=30)
+        
+        try:
+            connection.request("GET", url.path)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            # Drop the broken socket; the next attempt reconnects
+            logger.debug(f"Download of {tile_url} failed: {e}")
+            connection.close()
+            del connections[url.netloc]
+            return False
+        
+        if response.status != 200 or data[:8] != PNG_MAGIC:
+            return False
+        
+        tmp_path = tile_path.with_name(tile_path.name + '.tmp')
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, tile_path)
+            return True
+        except OSError as e:
+            logger.debug(f"Could not write {tile_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+    
     def _download_tile_with_retry(self, tile_url: str, tile_path: Path, max_retries: int = 5) -> bool:
         """Enhanced download tile with robust retry mechanism"""
         for attempt in range(max_retries):
-            try:
-                # Use curl with better options for reliability
-                cmd = [
-                    'curl', '-s', '-L', '--max-time', '30', '--retry', '2', 
-                    '--retry-delay', '1', '-o', str(tile_path), tile_url
-                ]
-                result = subprocess.run(cmd, timeout=45, capture_output=True)
-                
-                if result.returncode == 0 and self.validate_tile(tile_path):
-                    return True
-                
-                # Clean up invalid file
-                if tile_path.exists():
-                    tile_path.unlink()
-                    
-            except subprocess.TimeoutExpired:
-                if tile_path.exists():
-                    tile_path.unlink()
-            except Exception as e:
-                logger.debug(f"Download attempt {attempt + 1} failed: {e}")
-                if tile_path.exists():
-                    tile_path.unlink()
+            if self._fetch_tile(tile_url, tile_path):
+                return True
             
             # Exponential backoff with jitter
             if attempt < max_retries - 1:
@@ -204,19 +473,15 @@ class TileValidator:
     
     def detailed_validation_report(self, config: Dict) -> Dict:
         """Get detailed validation report with per-zoom statistics"""
-        bbox = config.get('bbox')
-        render_type = config.get('render_type', 'bbox')
-        zoom_levels = config.get('zoom_levels', {})
-        min_zoom = zoom_levels.get('min_zoom', 0)
-        max_zoom = zoom_levels.get('max_zoom', 12)
-        
-        if render_type != 'bbox' or not bbox:
+        zoom_ranges = self._zoom_ranges(config)
+        if zoom_ranges is None:
             logger.warning("Only bbox validation is supported")
             return {}
         
         project_name = config['name']
         logger.info(f"Scanning tiles for project: {project_name}")
-        logger.info(f"Zoom range: {min_zoom} - {max_zoom}")
+        zoom_levels = config.get('zoom_levels', {})
+        logger.info(f"Zoom range: {zoom_levels.get('min_zoom', 0)} - {zoom_levels.get('max_zoom', 12)}")
         logger.info(f"Output directory: {self.output_dir}")
         
         total_expected = 0
@@ -224,33 +489,18 @@ class TileValidator:
         zoom_stats = {}
         missing_tiles = []
         
-        for zoom in range(min_zoom, max_zoom + 1):
-            min_x, max_y = self._deg2num(bbox['min_lat'], bbox['min_lon'], zoom)
-            max_x, min_y = self._deg2num(bbox['max_lat'], bbox['max_lon'], zoom)
-            
-            # Ensure bounds
-            max_tiles = 2 ** zoom
-            min_x = max(0, min_x)
-            max_x = min(max_tiles - 1, max_x)
-            min_y = max(0, min_y)
-            max_y = min(max_tiles - 1, max_y)
-            
+        for zoom_range in zoom_ranges:
+            zoom, min_x, max_x, min_y, max_y = zoom_range
             zoom_expected = (max_x - min_x + 1) * (max_y - min_y + 1)
-            zoom_valid = 0
             zoom_missing = 0
             
-            for x in range(min_x, max_x + 1):
-                for y in range(min_y, max_y + 1):
-                    tile_path = self.output_dir / str(zoom) / str(x) / f"{y}.png"
-                    
-                    if self.validate_tile(tile_path):
-                        zoom_valid += 1
-                        total_valid += 1
-                    else:
-                        missing_tiles.append((zoom, x, y))
-                        zoom_missing += 1
-                    
-                    total_expected += 1
+            for _, x, missing in self._iter_columns((zoom_range,)):
+                missing_tiles.extend((zoom, x, y) for y in missing)
+                zoom_missing += len(missing)
+            
+            zoom_valid = zoom_expected - zoom_missing
+            total_valid += zoom_valid
+            total_expected += zoom_expected
             
             completion_rate = (zoom_valid / zoom_expected * 100) if zoom_expected > 0 else 0
             zoom_stats[zoom] = {
@@ -264,6 +514,8 @@ class TileValidator:
             if zoom_missing > 0:
                 logger.info(f"  Missing: {zoom_missing} tiles")
         
+        self._save_validation_cache()
+        
         overall_completion = (total_valid / total_expected * 100) if total_expected > 0 else 0
         logger.info(f"Overall completion: {total_valid}/{total_expected} tiles ({overall_completion:.1f}%)")
         
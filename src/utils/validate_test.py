@@ -7,66 +7,88 @@ This script provides a command-line interface for testing and validating
 tile completeness using the TileValidator class.
 """
 
+import os
 import sys
-import json
+import argparse
 import logging
+import logging.handlers
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+try:
+    from .tile_validator import TileValidator
+except ImportError:
+    # Run as a script: this file's directory is already on sys.path
+    from tile_validator import TileValidator
 
-from utils.tile_validator import TileValidator
-from config.config_manager import ConfigManager
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 def setup_logging(verbose: bool = False):
-    """Setup logging configuration"""
+    """Setup logging configuration
+    
+    The log file is written in batches of up to 1024 records; an ERROR
+    record or interpreter exit (logging.shutdown) flushes it at once.
+    """
     level = logging.DEBUG if verbose else logging.INFO
+    # MemoryHandler hands records to its target, which formats them itself
+    file_handler = logging.FileHandler('validation_test.log')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
     logging.basicConfig(
         level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=LOG_FORMAT,
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler('validation_test.log')
+            logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=file_handler)
         ]
     )
 
 def load_config(config_file: str) -> Optional[Dict]:
     """Load configuration from file"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return _loads(Path(config_file).read_bytes())
     except Exception as e:
         logging.error(f"Error loading config file: {e}")
         return None
 
+_REPORT_RULE = "=" * 60
+_REPORT_HEADER = f"{_REPORT_RULE}\nTILE VALIDATION REPORT\n{_REPORT_RULE}"
+
+def project_output_dir(config: Dict) -> str:
+    """Absolute tiles/<project> path, resolved once and handed to the validator as a string"""
+    return os.path.abspath(os.path.join("tiles", config['name']))
+
 def print_validation_report(report: Dict):
     """Print formatted validation report"""
-    print("="*60)
-    print("TILE VALIDATION REPORT")
-    print("="*60)
-    
     if not report:
-        print("No validation data available")
+        print(f"{_REPORT_HEADER}\nNo validation data available")
         return
     
-    print(f"Project: {report.get('project_name', 'Unknown')}")
-    print(f"Total Expected: {report.get('total_expected', 0):,} tiles")
-    print(f"Total Valid: {report.get('total_valid', 0):,} tiles")
-    print(f"Total Missing: {report.get('total_missing', 0):,} tiles")
-    print(f"Overall Completion: {report.get('overall_completion', 0):.1f}%")
+    # Collected and printed in one write
+    lines = [
+        _REPORT_HEADER,
+        f"Project: {report.get('project_name', 'Unknown')}",
+        f"Total Expected: {report.get('total_expected', 0):,} tiles",
+        f"Total Valid: {report.get('total_valid', 0):,} tiles",
+        f"Total Missing: {report.get('total_missing', 0):,} tiles",
+        f"Overall Completion: {report.get('overall_completion', 0):.1f}%"
+    ]
     
     if 'zoom_stats' in report:
-        print("\nPer-Zoom Statistics:")
-        print("-" * 40)
+        lines.append("\nPer-Zoom Statistics:")
+        lines.append("-" * 40)
         for zoom, stats in report['zoom_stats'].items():
-            print(f"Zoom {zoom:2d}: {stats['valid']:5,}/{stats['expected']:5,} "
-                  f"({stats['completion_rate']:5.1f}%)")
+            lines.append(f"Zoom {zoom:2d}: {stats['valid']:5,}/{stats['expected']:5,} "
+                         f"({stats['completion_rate']:5.1f}%)")
             if stats['missing'] > 0:
-                print(f"         Missing: {stats['missing']:,} tiles")
+                lines.append(f"         Missing: {stats['missing']:,} tiles")
     
-    print("="*60)
+    lines.append(_REPORT_RULE)
+    print("\n".join(lines))
 
 def run_validation_test(config_file: str, fix_missing: bool = False, verbose: bool = False):
     """Run complete validation test"""
@@ -81,11 +103,9 @@ def run_validation_test(config_file: str, fix_missing: bool = False, verbose: bo
         return False
     
     # Determine output directory
-    project_name = config['name']
-    tiles_dir = Path("tiles")
-    output_dir = tiles_dir / project_name
+    output_dir = project_output_dir(config)
     
-    if not output_dir.exists():
+    if not os.path.isdir(output_dir):
         logger.error(f"Output directory does not exist: {output_dir}")
         return False
     
@@ -117,17 +137,18 @@ def run_validation_test(config_file: str, fix_missing: bool = False, verbose: bo
         downloaded = validator.download_missing_tiles(missing_tiles, config)
         
         if downloaded > 0:
-            # Re-validate after download attempt
+            # Re-validate after download attempt; only the count is needed,
+            # so the missing tiles are streamed instead of collected
             print("\nINFO: Re-validating after download attempt...")
-            final_report = validator.detailed_validation_report(config)
+            final_report = validator.get_validation_report(config, preview_count=0)
             
-            remaining_missing = final_report.get('missing_tiles', [])
+            remaining_missing = final_report['missing']
             
             if not remaining_missing:
                 print("\nSUCCESS: All tiles completed successfully - 100% coverage achieved!")
                 return True
             else:
-                print(f"\nWARNING: {len(remaining_missing)} tiles still missing after retry")
+                print(f"\nWARNING: {remaining_missing} tiles still missing after retry")
                 print("These tiles may require manual investigation or server-side fixes")
                 return False
         else:
@@ -145,15 +166,14 @@ def run_quick_test(config_file: str):
         return False
     
     project_name = config['name']
-    tiles_dir = Path("tiles")
-    output_dir = tiles_dir / project_name
+    output_dir = project_output_dir(config)
     
-    if not output_dir.exists():
+    if not os.path.isdir(output_dir):
         print(f"ERROR: Output directory does not exist: {output_dir}")
         return False
     
     validator = TileValidator(output_dir)
-    report = validator.get_validation_report(config)
+    report = validator.get_validation_report(config, preview_count=0)
     
     print(f"Quick Test Results for '{project_name}':")
     print(f"  Expected: {report['expected']:,} tiles")
@@ -163,25 +183,47 @@ def run_quick_test(config_file: str):
     
     return report['missing'] == 0
 
+def print_usage():
+    """Print command line usage"""
+    print("\n".join([
+        "Usage: python validate_test.py <config_file> [options]",
+        "Options:",
+        "  --fix       Attempt to download missing tiles",
+        "  --quick     Run quick validation test only",
+        "  --verbose   Enable verbose logging",
+        "",
+        "Examples:",
+        "  python validate_test.py config/cyprus.json",
+        "  python validate_test.py config/cyprus.json --fix",
+        "  python validate_test.py config/cyprus.json --quick"
+    ]))
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse the options listed in print_usage in one pass; unknown ones are ignored"""
+    # Help is ours (print_usage) so the examples stay in the output
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('config_file', nargs='?')
+    parser.add_argument('-h', '--help', action='store_true')
+    parser.add_argument('--fix', action='store_true')
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--verbose', action='store_true')
+    options, _ = parser.parse_known_args(args)
+    return options
+
 def main():
     """Main CLI interface"""
-    if len(sys.argv) < 2:
-        print("Usage: python validate_test.py <config_file> [options]")
-        print("Options:")
-        print("  --fix       Attempt to download missing tiles")
-        print("  --quick     Run quick validation test only")
-        print("  --verbose   Enable verbose logging")
-        print()
-        print("Examples:")
-        print("  python validate_test.py config/cyprus.json")
-        print("  python validate_test.py config/cyprus.json --fix")
-        print("  python validate_test.py config/cyprus.json --quick")
+    options = parse_args(sys.argv[1:])
+    if options.help:
+        print_usage()
+        sys.exit(0)
+    if not options.config_file:
+        print_usage()
         sys.exit(1)
     
-    config_file = sys.argv[1]
-    fix_missing = '--fix' in sys.argv
-    quick_mode = '--quick' in sys.argv
-    verbose = '--verbose' in sys.argv
+    config_file = options.config_file
+    fix_missing = options.fix
+    quick_mode = options.quick
+    verbose = options.verbose
     
     if not Path(config_file).exists():
         print(f"ERROR: Config file does not exist: {config_file}")